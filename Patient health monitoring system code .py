@@ -1,81 +1,80 @@
+import os
 import tkinter as tk
 from tkinter import filedialog, messagebox, Frame, Scrollbar, Text, ttk
-import pandas as pd
-
-# Updated recommendations for specific medical conditions
-recommendations = {
-    "Cancer": {
-        "Medications": ["Cyclophosphamide", "Methotrexate"],
-        "Treatment": ["Chemotherapy", "Radiation therapy", "Immunotherapy", "Surgery if needed"],
-        "Diet": ["High-protein diet", "Nutrient-dense foods", "Avoid processed foods"]
-    },
-    "Obesity": {
-        "Medications": ["Orlistat", "Phentermine (if prescribed)"],
-        "Treatment": ["Weight management programs", "Physical activity", "Lifestyle changes"],
-        "Diet": ["Low-calorie, high-fiber diet", "Avoid sugary and processed foods"]
-    },
-    "Diabetes": {
-        "Medications": ["Metformin", "Insulin if needed"],
-        "Treatment": ["Blood sugar monitoring", "Exercise", "Regular check-ups"],
-        "Diet": ["Low-carb, high-protein diet", "Avoid sugary foods and drinks"]
-    },
-    "Asthma": {
-        "Medications": ["Albuterol", "Salbutamol", "Corticosteroids"],
-        "Treatment": ["Breathing exercises", "Avoid allergens", "Use air purifiers"],
-        "Diet": ["Anti-inflammatory foods", "Avoid dairy and processed foods"]
-    },
-    "Hypertension": {
-        "Medications": ["Amlodipine", "Losartan", "Beta-blockers"],
-        "Treatment": ["Stress management", "Regular exercise", "Adequate sleep"],
-        "Diet": ["Low-sodium diet", "Potassium-rich foods like bananas and spinach"]
-    },
-    "Arthritis": {
-        "Medications": ["Ibuprofen", "Naproxen", "Methotrexate"],
-        "Treatment": ["Physical therapy", "Joint exercises", "Heat/cold therapy"],
-        "Diet": ["Anti-inflammatory foods", "Omega-3 rich foods", "Avoid processed sugar"]
-    }
-}
-
-# Load patient data from CSV file
+from patient_core import alert_report, find_patient, load_patients, patient_report, trend_report
+from patient_loader import PatientStore
+from vitals_mmap import MMAP_MIN_BYTES
+from task_runner import TaskRunner
+from alerts import scan_store
+from trends import scan_trends
+from metrics import start_textfile_export, timed
+from diagnostics import DiagnosticsWindow
+
+# Load patient data from CSV file (parsed on a worker thread)
+@timed("load_patient_data")
 def load_patient_data():
+    global load_task
     file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
     if file_path:
-        try:
-            global patient_df
-            patient_df = pd.read_csv(file_path)
-            messagebox.showinfo("Success", "Patient data loaded successfully!")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to load CSV file: {e}")
+        if load_task is not None:
+            load_task.cancel()
+        progress_var.set(0)
+        memory_mapped = mmap_var.get() or os.path.getsize(file_path) >= MMAP_MIN_BYTES
+        load_task = runner.submit(read_patient_csv, file_path, memory_mapped, on_done=patient_data_loaded,
+                                  on_error=patient_data_failed, on_progress=progress_var.set, cancellable=True)
+
+# Worker: read the binary cache if it is current, else stream the CSV in chunks.
+# Memory-mapped mode keeps the rows on disk and reads only the pages a lookup needs.
+def read_patient_csv(task, file_path, memory_mapped=False):
+    def report(bytes_read, total_bytes):
+        task.set_progress(100 * bytes_read / total_bytes if total_bytes else 100)
+    return load_patients(file_path, memory_mapped, on_progress=report, cancel_event=task.cancel_event)
+
+def patient_data_loaded(result):
+    global patient_store, patient_index, load_task
+    patient_store, patient_index = result
+    load_task = None
+    progress_var.set(100)
+    megabytes = patient_store.memory_usage() / 1024 ** 2
+    messagebox.showinfo("Success", f"Patient data loaded successfully! ({len(patient_store)} rows, {megabytes:.1f} MB in memory)")
+    problems = getattr(patient_store, "problems", None)
+    if problems:
+        details = ", ".join(f"{count} in {column}" for column, count in problems.items())
+        messagebox.showwarning("Unreadable Values", f"Some values could not be read and were left blank: {details}")
+
+def patient_data_failed(e):
+    global load_task
+    load_task = None
+    messagebox.showerror("Error", f"Failed to load CSV file: {e}")
+
+# Cancel an in-progress CSV load
+def cancel_load():
+    global load_task
+    if load_task is not None:
+        load_task.cancel()
+        load_task = None
+        progress_var.set(0)
+
+# Show a busy cursor and status while background work is running
+def set_busy(busy):
+    root.config(cursor="watch" if busy else "")
+    status_var.set("Working..." if busy else "Ready")
 
 # Display patient data by name or ID
+@timed("display_patient_data")
 def display_patient_data():
     search_value = search_entry.get().strip()
     search_type = search_type_var.get()
 
-    if patient_df is not None and search_value:
+    if not patient_store.empty and search_value:
         try:
-            if search_type == "Patient Name":
-                patient = patient_df[patient_df['Name'].astype(str).str.lower() == search_value.lower()]
-            elif search_type == "Patient ID":
-                patient = patient_df[patient_df['Patient_ID'].astype(str) == search_value]
-            else:
-                messagebox.showwarning("Invalid Search", "Please select a valid search type.")
-                return
+            # O(1) hash lookup instead of scanning every row
+            patient = find_patient(patient_store, patient_index, search_type, search_value)
 
             if not patient.empty:
-                condition = patient.iloc[0].get('Medical Condition', 'N/A')
-                meds = recommendations.get(condition, {}).get('Medications', ['No medication available'])
-                treatment = recommendations.get(condition, {}).get('Treatment', ['No treatment available'])
-                diet = recommendations.get(condition, {}).get('Diet', ['No diet recommendation available'])
-
                 result_text.config(state=tk.NORMAL)
                 result_text.delete(1.0, tk.END)
-                result_text.insert(tk.END, f"Patient Name: {patient.iloc[0].get('Name', 'N/A')}\n")
-                result_text.insert(tk.END, f"Patient ID: {patient.iloc[0].get('Patient_ID', 'N/A')}\n")
-                result_text.insert(tk.END, f"Medical Condition: {condition}\n\n")
-                result_text.insert(tk.END, f"Medications: {', '.join(meds)}\n")
-                result_text.insert(tk.END, f"Treatment: {', '.join(treatment)}\n")
-                result_text.insert(tk.END, f"Diet: {', '.join(diet)}\n")
+                result_text.insert(tk.END, patient_report(patient))
                 result_text.config(state=tk.DISABLED)
 
                 # Add to search history
@@ -84,10 +83,42 @@ def display_patient_data():
 
             else:
                 messagebox.showwarning("Not Found", "Patient not found!")
+        except ValueError:
+            messagebox.showwarning("Invalid Search", "Please select a valid search type.")
         except KeyError as e:
             messagebox.showerror("Error", f"Column not found: {e}")
         except Exception as e:
             messagebox.showerror("Error", f"Failed to fetch patient data: {e}")
+# Scan every loaded reading against its targets (runs on a worker thread)
+@timed("scan_alerts")
+def scan_alerts():
+    if patient_store.empty:
+        messagebox.showwarning("No Data", "Please load patient data first.")
+        return
+    runner.submit(scan_store, patient_store, on_done=show_alerts,
+                  on_error=lambda e: messagebox.showerror("Error", f"Failed to scan alerts: {e}"))
+
+def show_alerts(alerts):
+    result_text.config(state=tk.NORMAL)
+    result_text.delete(1.0, tk.END)
+    result_text.insert(tk.END, alert_report(alerts, len(patient_store)))
+    result_text.config(state=tk.DISABLED)
+
+# Per-patient trends over every loaded reading (runs on a worker thread)
+@timed("report_trends")
+def report_trends():
+    if patient_store.empty:
+        messagebox.showwarning("No Data", "Please load patient data first.")
+        return
+    runner.submit(scan_trends, patient_store, on_done=show_trend_report,
+                  on_error=lambda e: messagebox.showerror("Error", f"Failed to compute trends: {e}"))
+
+def show_trend_report(trends):
+    result_text.config(state=tk.NORMAL)
+    result_text.delete(1.0, tk.END)
+    result_text.insert(tk.END, trend_report(trends))
+    result_text.config(state=tk.DISABLED)
+
 #update search history display
 def update_search_history():
     history_text.config(state=tk.NORMAL)
@@ -96,56 +127,94 @@ def update_search_history():
         history_text.insert(tk.END, f"{entry}\n")
     history_text.config(state=tk.DISABLED)
 
-# Create GUI window
-root = tk.Tk()
-root.title("Patient Health Monitoring System")
-root.geometry("800x700")
-root.configure(bg='#e0f7fa')
-
-header_label = tk.Label(root, text="Patient Health Monitoring System", font=("Arial", 18, "bold"), bg='#00796b', fg='white')
-header_label.pack(pady=10, fill=tk.X)
+# Stop background work before closing the window
+def close_app():
+    runner.shutdown()
+    root.destroy()
 
-patient_df = None
+# Loaded data and GUI state; set up by main()
+patient_store = PatientStore()
+patient_index = None
+load_task = None
 search_history = []
+root = runner = None
+
+def main():
+    global root, runner, progress_var, mmap_var, status_var, search_type_var, search_entry, result_text, history_text
+
+    # Create GUI window
+    root = tk.Tk()
+    root.title("Patient Health Monitoring System")
+    root.geometry("800x700")
+    root.configure(bg='#e0f7fa')
 
-# Button to load patient data from CSV
-tk.Button(root, text="Load Patient Data (CSV)", command=load_patient_data, bg='#00796b', fg='white', font=("Arial", 12)).pack(pady=10)
+    header_label = tk.Label(root, text="Patient Health Monitoring System", font=("Arial", 18, "bold"), bg='#00796b', fg='white')
+    header_label.pack(pady=10, fill=tk.X)
 
-# Search type selection
-search_frame = Frame(root, bg='#e0f7fa')
-search_frame.pack(pady=5)
+    runner = TaskRunner(root, on_busy=set_busy)
 
-search_type_var = tk.StringVar(value="Patient Name")
-ttk.Combobox(search_frame, textvariable=search_type_var, values=["Patient Name", "Patient ID"], font=("Arial", 12)).pack(pady=10)
+    # Button to load patient data from CSV
+    tk.Button(root, text="Load Patient Data (CSV)", command=load_patient_data, bg='#00796b', fg='white', font=("Arial", 12)).pack(pady=10)
 
-# Search entry
-search_entry = tk.Entry(root, font=("Arial", 12), width=30)
-search_entry.pack(pady=5)
+    # Progress of the current CSV load
+    progress_var = tk.DoubleVar(value=0)
+    ttk.Progressbar(root, variable=progress_var, maximum=100, length=300).pack(pady=5)
+    tk.Button(root, text="Cancel Load", command=cancel_load, font=("Arial", 10)).pack()
 
-# Button to fetch patient data
-tk.Button(root, text="Fetch Patient Data", command=display_patient_data, bg='#004d40', fg='white', font=("Arial", 12)).pack(pady=10)
+    # Memory-mapped loading (always used for files over MMAP_MIN_BYTES)
+    mmap_var = tk.BooleanVar(value=False)
+    tk.Checkbutton(root, text="Memory-mapped (large files)", variable=mmap_var, font=("Arial", 10), bg='#e0f7fa').pack()
 
-# Text box for patient data
-text_frame = Frame(root, bg='#e0f7fa')
-text_frame.pack(pady=10, fill=tk.BOTH, expand=True)
+    status_var = tk.StringVar(value="Ready")
+    tk.Label(root, textvariable=status_var, font=("Arial", 10), bg='#e0f7fa').pack()
 
-scrollbar = Scrollbar(text_frame)
-scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+    # Search type selection
+    search_frame = Frame(root, bg='#e0f7fa')
+    search_frame.pack(pady=5)
 
-result_text = Text(text_frame, font=("Arial", 12), wrap=tk.WORD, yscrollcommand=scrollbar.set, height=10, bg='white', fg='black')
-result_text.pack(fill=tk.BOTH, expand=True)
-result_text.config(state=tk.DISABLED)
-scrollbar.config(command=result_text.yview)
+    search_type_var = tk.StringVar(value="Patient Name")
+    ttk.Combobox(search_frame, textvariable=search_type_var, values=["Patient Name", "Patient ID"], font=("Arial", 12)).pack(pady=10)
 
-# Search history display
-tk.Label(root, text="Recent Searches:", font=("Arial", 12, "bold"), bg='#e0f7fa').pack(pady=5)
-history_frame = Frame(root, bg='#e0f7fa')
-history_frame.pack(pady=5, fill=tk.BOTH, expand=True)
+    # Search entry
+    search_entry = tk.Entry(root, font=("Arial", 12), width=30)
+    search_entry.pack(pady=5)
 
-history_text = Text(history_frame, font=("Arial", 12), wrap=tk.WORD, height=5, bg='white', fg='black')
-history_text.pack(fill=tk.BOTH, expand=True)
-history_text.config(state=tk.DISABLED)
+    # Button to fetch patient data
+    tk.Button(root, text="Fetch Patient Data", command=display_patient_data, bg='#004d40', fg='white', font=("Arial", 12)).pack(pady=10)
 
-root.mainloop()
+    # Button to check all loaded readings against their targets
+    tk.Button(root, text="Scan Alerts", command=scan_alerts, bg='#b71c1c', fg='white', font=("Arial", 12)).pack(pady=5)
+
+    # Button to summarize every patient's vitals trends
+    tk.Button(root, text="Trend Report", command=report_trends, bg='#004d40', fg='white', font=("Arial", 12)).pack(pady=5)
+
+    # Timings of the callbacks above, the background loads and scans
+    tk.Button(root, text="Diagnostics", command=lambda: DiagnosticsWindow(root), font=("Arial", 10)).pack()
+
+    # Text box for patient data
+    text_frame = Frame(root, bg='#e0f7fa')
+    text_frame.pack(pady=10, fill=tk.BOTH, expand=True)
+
+    scrollbar = Scrollbar(text_frame)
+    scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    result_text = Text(text_frame, font=("Arial", 12), wrap=tk.WORD, yscrollcommand=scrollbar.set, height=10, bg='white', fg='black')
+    result_text.pack(fill=tk.BOTH, expand=True)
+    result_text.config(state=tk.DISABLED)
+    scrollbar.config(command=result_text.yview)
+
+    # Search history display
+    tk.Label(root, text="Recent Searches:", font=("Arial", 12, "bold"), bg='#e0f7fa').pack(pady=5)
+    history_frame = Frame(root, bg='#e0f7fa')
+    history_frame.pack(pady=5, fill=tk.BOTH, expand=True)
+
+    history_text = Text(history_frame, font=("Arial", 12), wrap=tk.WORD, height=5, bg='white', fg='black')
+    history_text.pack(fill=tk.BOTH, expand=True)
+    history_text.config(state=tk.DISABLED)
 
+    root.protocol("WM_DELETE_WINDOW", close_app)
+    start_textfile_export(root)
+    root.mainloop()
 
+if __name__ == "__main__":
+    main()
@@ -1,90 +1,103 @@
 import tkinter as tk
-from tkinter import messagebox, ttk
-import sqlite3
-import bcrypt
-import pandas as pd  # Import pandas for Excel export
+from tkinter import filedialog, messagebox, ttk
+from db_pool import ConnectionPool
 import os  # To check current working directory
-
-# Database Connection
-conn = sqlite3.connect("patient_monitoring.db")
-cursor = conn.cursor()
-
-# Create Tables if Not Exists
-cursor.execute('''CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    password TEXT NOT NULL,
-                    role TEXT NOT NULL)''')
-
-cursor.execute('''CREATE TABLE IF NOT EXISTS patients (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    age INTEGER NOT NULL,
-                    condition TEXT NOT NULL,
-                    heart_rate INTEGER,
-                    temperature REAL,
-                    health_problem TEXT,
-                    treatment_required TEXT NOT NULL)''')
-
-# Check if medications column exists and add it if it doesn't
-try:
-    cursor.execute("SELECT medications FROM patients LIMIT 1")
-except sqlite3.OperationalError:
-    cursor.execute("ALTER TABLE patients ADD COLUMN medications TEXT")
-    print("Added medications column to patients table")
-
-# Check if diet_plan column exists and add it if it doesn't
-try:
-    cursor.execute("SELECT diet_plan FROM patients LIMIT 1")
-except sqlite3.OperationalError:
-    cursor.execute("ALTER TABLE patients ADD COLUMN diet_plan TEXT")
-    print("Added diet_plan column to patients table")
-
-conn.commit()
-
-# Method 1: Add Default Doctor User if No Users Exist
-def add_default_doctor():
-    cursor.execute("SELECT COUNT(*) FROM users")
-    if cursor.fetchone()[0] == 0:  # If no users exist
-        username = "doctor1"
-        password = "password123"
-        hashed_password = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
-        
-        cursor.execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
-                       (username, hashed_password, "doctor"))
-        conn.commit()
-        print("Default doctor user added: Username = doctor1, Password = password123")
-
-# Run the function to ensure a doctor user exists
-add_default_doctor()
-
-# Function to export patient data to an Excel file
-def export_to_excel():
-    try:
-        cursor.execute("SELECT * FROM patients")
-        data = cursor.fetchall()
-        
-        if data:
-            columns = ["ID", "Name", "Age", "Condition", "Heart Rate", "Temperature", 
-                      "Health Problem", "Treatment Required", "Medications", "Diet Plan"]
-            df = pd.DataFrame(data, columns=columns)
-            
-            # Get the current working directory
-            current_directory = os.getcwd()
-            print("Current Directory:", current_directory)
-
-            # Save to the current directory
-            df.to_excel(os.path.join(current_directory, "patients.xlsx"), index=False, engine="openpyxl")
-            messagebox.showinfo("Success", "Patient data exported to patients.xlsx")
-        else:
-            messagebox.showwarning("No Data", "No patient data available to export.")
-    except Exception as e:
-        messagebox.showerror("Error", f"An error occurred while exporting data: {str(e)}")
+from datetime import date
+from auth import LoginVerifier, RateLimited
+from task_runner import Task, TaskRunner
+from metrics import start_textfile_export, timed
+from diagnostics import DiagnosticsWindow
+from excel_export import ExportScheduler
+import patient_core
+from patient_core import PATIENT_SELECT
+from vitals_store import bulk_load_vitals
+from journal_store import (entry_history, monthly_rollup, parse_date, save_entries, save_weekly_summaries,
+                           week_start, weekly_rollup)
+from patient_grid import PagedPatientGrid, fetch_page
+
+DB_PATH = "patient_monitoring.db"
+EXPORT_PATH = os.path.join(os.getcwd(), "patients.xlsx")
+
+# How often the dashboard applies live vitals updates
+LIVE_POLL_MS = 1000
+
+# Database Connection (one pooled connection per thread, WAL mode; opened on first use)
+db = ConnectionPool(DB_PATH)
+
+# Set once the schema is ready; False means searches fall back to LIKE
+FTS_AVAILABLE = False
+
+# Get the database ready; runs on a worker thread after the login window is shown
+def prepare_database():
+    global FTS_AVAILABLE
+    # Versioned schema migrations (see migrations.py) and the default doctor user;
+    # a no-op once up to date
+    conn = db.connection()
+    for description in patient_core.prepare_database(conn):
+        print(f"Applied migration: {description}")
+    FTS_AVAILABLE = patient_core.has_search_index(conn)
+
+# Save a new or edited patient (runs on a worker thread)
+def add_patient(name, age, condition, health_problem, treatment, medications, diet_plan):
+    return patient_core.add_patient(db.connection(), name, age, condition, health_problem,
+                                    treatment, medications, diet_plan)
+
+def update_patient(patient_id, name, age, condition, health_problem, treatment, medications, diet_plan):
+    patient_core.update_patient(db.connection(), patient_id, name, age, condition, health_problem,
+                                treatment, medications, diet_plan)
+    return patient_id
+
+# Look up a user row for login verification (runs on an auth worker thread)
+def fetch_user(username):
+    return db.connection().execute("SELECT * FROM users WHERE username=?", (username,)).fetchone()
+
+# Fetch patients matching a name or ID (runs on a worker thread)
+def query_patients(search_term):
+    return patient_core.query_patients(db.connection(), search_term, use_fts=FTS_AVAILABLE)
+
+# Fetch one keyset page of patients for the dashboard grid (runs on a worker thread)
+def query_patient_page(after_id, before_id):
+    return fetch_page(db.connection(), PATIENT_SELECT, after_id=after_id, before_id=before_id)
+
+# Fetch specific patients by id (runs on a worker thread)
+def query_patients_by_ids(patient_ids):
+    return patient_core.query_patients_by_ids(db.connection(), patient_ids)
+
+# Load a vitals dataset CSV into the vitals table (runs on a worker thread)
+def import_vitals(file_path):
+    count, seconds = bulk_load_vitals(db.connection(), file_path)
+    return count
+
+# Learning Journal storage (runs on a worker thread)
+def save_journal_entries(entries):
+    save_entries(db.connection(), entries)
+
+def load_journal_history(patient_id, before):
+    return entry_history(db.connection(), patient_id, before)
+
+def save_weekly_summary(summary):
+    save_weekly_summaries(db.connection(), [summary])
+
+def load_weekly_rollup(patient_id, week):
+    return weekly_rollup(db.connection(), patient_id, week)
+
+def load_monthly_rollup(patient_id, month):
+    return monthly_rollup(db.connection(), patient_id, month)
 
 # Tkinter App
 class PatientApp:
-    def _init_(self, root):
+    def __init__(self, root):
         self.root = root
+        self.doctor_win = None
+        self.stream = None
+        self.closing = False
+        self.tree_task = None
+        self.runner = TaskRunner(root, on_busy=self.set_busy)
+        self.verifier = LoginVerifier(fetch_user)
+        # Edits are exported to patients.xlsx in debounced background batches
+        self.exporter = ExportScheduler(root, self.runner, db.connection, EXPORT_PATH,
+                                        on_error=lambda e: messagebox.showerror("Error", f"An error occurred while exporting data: {str(e)}"))
+        self.status_var = tk.StringVar(value="Ready")
         self.root.title("Patient Health Monitoring System")
         self.root.geometry("400x300")
 
@@ -96,23 +109,71 @@ class PatientApp:
         self.password_entry = tk.Entry(root, show="*")
         self.password_entry.pack()
 
-        tk.Button(root, text="Login", command=self.login).pack()
+        # Enabled once prepare_database() has finished in the background
+        self.login_button = tk.Button(root, text="Login", command=self.login, state=tk.DISABLED)
+        self.login_button.pack()
+        tk.Label(root, textvariable=self.status_var).pack()
+
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+        self.runner.submit(prepare_database, on_done=self.database_ready,
+                           on_error=lambda e: messagebox.showerror("Error", f"Failed to open the database: {e}"))
+        self.status_var.set("Preparing database...")
+        start_textfile_export(root)
 
+    def database_ready(self, _):
+        self.login_button.config(state=tk.NORMAL)
+
+    def close(self):
+        """Stop background work before closing the window"""
+        if self.closing:
+            return
+        self.closing = True
+        if self.stream is not None:
+            self.stream.stop()
+        # Edits saved within EXPORT_DELAY_MS of closing would otherwise never reach the file
+        self.exporter.finish(self.export_finished)
+        self.status_var.set("Saving export before closing...")
+
+    def export_finished(self, error):
+        if error is not None:
+            messagebox.showerror("Error", f"An error occurred while exporting data: {str(error)}")
+        # Tear down after the runner's poll that delivered this has returned
+        self.root.after_idle(self.shut_down)
+
+    def shut_down(self):
+        self.runner.shutdown()
+        self.verifier.shutdown()
+        db.close_all()
+        self.root.destroy()
+
+    @timed("login")
     def login(self):
         username = self.username_entry.get()
-        password = self.password_entry.get().encode("utf-8")
+        password = self.password_entry.get()
 
-        cursor.execute("SELECT * FROM users WHERE username=?", (username,))
-        user = cursor.fetchone()
+        # bcrypt runs on the auth pool; the result comes back through the task runner
+        try:
+            task = Task(on_done=self.login_done, on_error=self.login_failed)
+            task.future = self.verifier.submit(username, password)
+        except RateLimited as e:
+            messagebox.showerror("Error", str(e))
+            return
+        self.login_button.config(state=tk.DISABLED)
+        self.runner.watch(task)
 
-        if user and bcrypt.checkpw(password, user[2].encode("utf-8")):
-            role = user[3]
+    def login_done(self, role):
+        self.login_button.config(state=tk.NORMAL)
+        if role:
             messagebox.showinfo("Success", f"Login successful! Role: {role}")
             if role == "doctor":
                 self.open_doctor_dashboard()
         else:
             messagebox.showerror("Error", "Invalid username or password")
 
+    def login_failed(self, e):
+        self.login_button.config(state=tk.NORMAL)
+        messagebox.showerror("Error", str(e))
+
     def open_doctor_dashboard(self):
         self.doctor_win = tk.Toplevel(self.root)
         self.doctor_win.title("Doctor Dashboard")
@@ -130,17 +191,17 @@ class PatientApp:
         tk.Button(search_frame, text="Search", command=self.search_patients).pack(side=tk.LEFT)
         tk.Button(search_frame, text="Clear Search", command=self.load_patients).pack(side=tk.LEFT, padx=5)
 
-        # Treeview Setup
+        # Treeview Setup (only a window of rows is materialized; pages load as you scroll)
         columns = ("ID", "Name", "Age", "Condition", "Heart Rate", "Temperature", 
                   "Health Problem", "Treatment Required", "Medications", "Diet Plan")
-        self.tree = ttk.Treeview(self.doctor_win, columns=columns, show="headings")
+        self.grid = PagedPatientGrid(self.doctor_win, columns, self.runner, query_patient_page,
+                                     on_error=self.show_db_error)
+        self.tree = self.grid.tree
 
         for col in columns:
             self.tree.heading(col, text=col)
             self.tree.column(col, width=110)  # Adjusted width to fit more columns
 
-        self.tree.pack(expand=True, fill="both")
-
         # Button Frame
         button_frame = tk.Frame(self.doctor_win)
         button_frame.pack(pady=10)
@@ -148,10 +209,39 @@ class PatientApp:
         tk.Button(button_frame, text="Add Patient", command=self.add_patient_window).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Edit Patient", command=self.edit_patient_window).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Refresh", command=self.load_patients).pack(side=tk.LEFT, padx=5)
-        tk.Button(button_frame, text="Export to Excel", command=export_to_excel).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Export to Excel", command=self.export_to_excel).pack(side=tk.LEFT, padx=5)
         tk.Button(button_frame, text="Learning Journal", command=self.open_learning_journal).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Import Vitals (CSV)", command=self.import_vitals).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Cancel", command=self.runner.cancel_all).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Diagnostics", command=lambda: DiagnosticsWindow(self.doctor_win)).pack(side=tk.LEFT, padx=5)
+
+        tk.Label(self.doctor_win, textvariable=self.status_var).pack()
 
         self.load_patients()
+        self.start_live_updates()
+
+    def start_live_updates(self):
+        """Start ingesting live vitals and push changed rows into the open grid"""
+        if self.stream is None:
+            # Imported here so asyncio is only loaded once a dashboard is opened
+            from vitals_stream import VitalsStreamServer
+            self.stream = VitalsStreamServer(db.connection)
+            self.stream.start()
+            self.root.after(LIVE_POLL_MS, self.apply_live_updates)
+
+    def apply_live_updates(self):
+        error = self.stream.take_error()
+        if not self.stream.running:
+            # The server never started (e.g. the port is already in use) or has stopped
+            self.stream = None
+            messagebox.showerror("Error", f"Live vitals are unavailable: {error or 'the stream server stopped'}")
+            return
+        if error is not None:
+            self.status_var.set(f"Live vitals: {error}")
+        changed = self.stream.drain_changes()
+        if changed and self.doctor_win is not None and self.doctor_win.winfo_exists():
+            self.runner.submit(query_patients_by_ids, changed, on_done=self.grid.refresh_rows)
+        self.root.after(LIVE_POLL_MS, self.apply_live_updates)
 
     def open_learning_journal(self):
         selected_item = self.tree.selection()
@@ -165,7 +255,7 @@ class PatientApp:
         
         journal_win = tk.Toplevel(self.root)
         journal_win.title(f"Learning Journal for {patient_name}")
-        journal_win.geometry("600x700")
+        journal_win.geometry("650x950")
         
         # Create notebook for tabs
         notebook = ttk.Notebook(journal_win)
@@ -198,6 +288,7 @@ class PatientApp:
         
         tk.Label(daily_frame, text="Date:").grid(row=4, column=0, sticky="w", padx=10, pady=5)
         date_entry = tk.Entry(daily_frame, width=20)
+        date_entry.insert(0, date.today().isoformat())
         date_entry.grid(row=4, column=1, sticky="w", padx=10, pady=5)
         
         tk.Label(daily_frame, text="Medication Adherence:").grid(row=5, column=0, sticky="w", padx=10, pady=5)
@@ -227,33 +318,169 @@ class PatientApp:
         notes_entry.grid(row=10, column=1, sticky="w", padx=10, pady=5)
         
         def save_journal():
-            messagebox.showinfo("Success", "Journal entry saved successfully!")
+            try:
+                entry_date = parse_date(date_entry.get())
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            entry = (int(patient_id), entry_date, int(med_var.get() == "Yes"), int(diet_var.get() == "Yes"),
+                     symptoms_entry.get("1.0", tk.END).strip(), side_effects_entry.get("1.0", tk.END).strip(),
+                     mood_scale.get(), notes_entry.get("1.0", tk.END).strip())
+
+            def saved(_):
+                messagebox.showinfo("Success", "Journal entry saved successfully!")
+                reload_history()
+                refresh_weekly_rates()
+                refresh_monthly_report()
+
+            self.runner.submit(save_journal_entries, [entry], on_done=saved, on_error=self.show_db_error)
         
         tk.Button(daily_frame, text="Save Entry", command=save_journal, width=20).grid(row=11, column=0, columnspan=2, pady=20)
+
+        # Past entries, newest first; older pages are fetched on demand
+        history_columns = ("Date", "Medication", "Diet", "Mood", "Symptoms")
+        history_tree = ttk.Treeview(daily_frame, columns=history_columns, show="headings", height=6)
+        for col in history_columns:
+            history_tree.heading(col, text=col)
+            history_tree.column(col, width=90 if col != "Symptoms" else 220)
+        history_tree.grid(row=12, column=0, columnspan=2, sticky="we", padx=10, pady=5)
+
+        def show_history(rows):
+            if not history_tree.winfo_exists():
+                return  # Window closed while the page was loading
+            for row in rows:
+                if history_tree.exists(row[1]):
+                    continue
+                history_tree.insert("", "end", iid=row[1], values=(row[1], "Yes" if row[2] else "No",
+                                                                  "Yes" if row[3] else "No", row[6], row[4]))
+
+        def load_older():
+            items = history_tree.get_children()
+            before = items[-1] if items else None
+            self.runner.submit(load_journal_history, int(patient_id), before, on_done=show_history,
+                               on_error=self.show_db_error)
+
+        def reload_history():
+            history_tree.delete(*history_tree.get_children())
+            load_older()
+
+        tk.Button(daily_frame, text="Load Older Entries", command=load_older).grid(row=13, column=0, columnspan=2, pady=5)
+        load_older()
         
         # Weekly summary tab content
         tk.Label(weekly_frame, text=f"Weekly Summary for {patient_name}", font=("Arial", 12, "bold")).pack(anchor="w", padx=10, pady=10)
         
         tk.Label(weekly_frame, text="Week Starting:").pack(anchor="w", padx=10, pady=5)
-        tk.Entry(weekly_frame, width=20).pack(anchor="w", padx=10, pady=5)
+        week_entry = tk.Entry(weekly_frame, width=20)
+        week_entry.insert(0, week_start(date.today()))
+        week_entry.pack(anchor="w", padx=10, pady=5)
         
         tk.Label(weekly_frame, text="Progress Summary:").pack(anchor="w", padx=10, pady=5)
-        tk.Text(weekly_frame, width=50, height=5).pack(anchor="w", padx=10, pady=5)
+        progress_text = tk.Text(weekly_frame, width=50, height=5)
+        progress_text.pack(anchor="w", padx=10, pady=5)
         
         tk.Label(weekly_frame, text="Medication Compliance Rate (%):").pack(anchor="w", padx=10, pady=5)
-        tk.Scale(weekly_frame, from_=0, to=100, orient=tk.HORIZONTAL, length=200).pack(anchor="w", padx=10, pady=5)
+        med_rate_scale = tk.Scale(weekly_frame, from_=0, to=100, orient=tk.HORIZONTAL, length=200)
+        med_rate_scale.pack(anchor="w", padx=10, pady=5)
         
         tk.Label(weekly_frame, text="Diet Compliance Rate (%):").pack(anchor="w", padx=10, pady=5)
-        tk.Scale(weekly_frame, from_=0, to=100, orient=tk.HORIZONTAL, length=200).pack(anchor="w", padx=10, pady=5)
+        diet_rate_scale = tk.Scale(weekly_frame, from_=0, to=100, orient=tk.HORIZONTAL, length=200)
+        diet_rate_scale.pack(anchor="w", padx=10, pady=5)
         
         tk.Label(weekly_frame, text="Challenges Faced:").pack(anchor="w", padx=10, pady=5)
-        tk.Text(weekly_frame, width=50, height=5).pack(anchor="w", padx=10, pady=5)
+        challenges_text = tk.Text(weekly_frame, width=50, height=5)
+        challenges_text.pack(anchor="w", padx=10, pady=5)
         
         tk.Label(weekly_frame, text="Adjustments Needed:").pack(anchor="w", padx=10, pady=5)
-        tk.Text(weekly_frame, width=50, height=5).pack(anchor="w", padx=10, pady=5)
-        
-        tk.Button(weekly_frame, text="Save Weekly Summary", width=20).pack(anchor="center", pady=20)
+        adjustments_text = tk.Text(weekly_frame, width=50, height=5)
+        adjustments_text.pack(anchor="w", padx=10, pady=5)
+
+        def save_weekly():
+            try:
+                # Keyed on the week's Monday, like the rollup the compliance rates come from
+                monday = week_start(week_entry.get())
+            except ValueError as e:
+                messagebox.showerror("Error", str(e))
+                return
+            week_entry.delete(0, tk.END)
+            week_entry.insert(0, monday)
+            summary = (int(patient_id), monday, progress_text.get("1.0", tk.END).strip(),
+                       med_rate_scale.get(), diet_rate_scale.get(),
+                       challenges_text.get("1.0", tk.END).strip(), adjustments_text.get("1.0", tk.END).strip())
+            self.runner.submit(save_weekly_summary, summary,
+                               on_done=lambda _: messagebox.showinfo("Success", "Weekly summary saved successfully!"),
+                               on_error=self.show_db_error)
+        
+        tk.Button(weekly_frame, text="Save Weekly Summary", command=save_weekly, width=20).pack(anchor="center", pady=20)
+
+        # Compliance rates come from the precomputed weekly rollup of daily entries
+        def show_weekly_rates(summary):
+            if not med_rate_scale.winfo_exists():
+                return
+            med_rate_scale.set(summary["medication_rate"] if summary else 0)
+            diet_rate_scale.set(summary["diet_rate"] if summary else 0)
+
+        def refresh_weekly_rates(event=None):
+            try:
+                week = parse_date(week_entry.get())
+            except ValueError:
+                return
+            self.runner.submit(load_weekly_rollup, int(patient_id), week, on_done=show_weekly_rates,
+                               on_error=self.show_db_error)
+
+        week_entry.bind("<FocusOut>", refresh_weekly_rates)
+        week_entry.bind("<Return>", refresh_weekly_rates)
+        refresh_weekly_rates()
+
+        # Monthly report tab content
+        tk.Label(monthly_frame, text=f"Monthly Report for {patient_name}", font=("Arial", 12, "bold")).pack(anchor="w", padx=10, pady=10)
 
+        tk.Label(monthly_frame, text="Month (YYYY-MM):").pack(anchor="w", padx=10, pady=5)
+        month_entry = tk.Entry(monthly_frame, width=20)
+        month_entry.insert(0, date.today().strftime("%Y-%m"))
+        month_entry.pack(anchor="w", padx=10, pady=5)
+
+        monthly_var = tk.StringVar()
+        tk.Label(monthly_frame, textvariable=monthly_var, justify=tk.LEFT, font=("Arial", 11)).pack(anchor="w", padx=10, pady=10)
+
+        def show_monthly_report(summary):
+            if not month_entry.winfo_exists():
+                return
+            if summary is None:
+                monthly_var.set("No journal entries recorded for this month.")
+                return
+            mood = summary["average_mood"] if summary["average_mood"] is not None else "N/A"
+            monthly_var.set(f"Days logged: {summary['days']}\n"
+                            f"Medication Compliance Rate: {summary['medication_rate']}%\n"
+                            f"Diet Compliance Rate: {summary['diet_rate']}%\n"
+                            f"Average Mood: {mood}")
+
+        def refresh_monthly_report():
+            self.runner.submit(load_monthly_rollup, int(patient_id), month_entry.get().strip(),
+                               on_done=show_monthly_report, on_error=self.show_db_error)
+
+        tk.Button(monthly_frame, text="Show Report", command=refresh_monthly_report, width=20).pack(anchor="center", pady=10)
+        refresh_monthly_report()
+
+    def set_busy(self, busy):
+        """Show a busy cursor and status while background work is running"""
+        cursor_name = "watch" if busy else ""
+        self.root.config(cursor=cursor_name)
+        if self.doctor_win is not None and self.doctor_win.winfo_exists():
+            self.doctor_win.config(cursor=cursor_name)
+        self.status_var.set("Working..." if busy else "Ready")
+
+    def run_search(self, search_term):
+        """Run a patient search in the background; a newer search supersedes an older one"""
+        if self.tree_task is not None:
+            self.tree_task.cancel()
+        self.tree_task = self.runner.submit(query_patients, search_term, on_done=self.show_search_results,
+                                            on_error=self.show_db_error)
+
+    def show_db_error(self, e):
+        messagebox.showerror("Error", f"Database error: {e}")
+
+    @timed("search_patients")
     def search_patients(self):
         """Search patients by name or ID"""
         search_term = self.search_entry.get().strip()
@@ -261,42 +488,44 @@ class PatientApp:
         if not search_term:
             messagebox.showinfo("Info", "Please enter a search term")
             return
-            
-        # Clear current view
-        self.tree.delete(*self.tree.get_children())
-        
-        # Check if the search term is a number (ID)
-        try:
-            # If it's an integer, search by ID
-            patient_id = int(search_term)
-            cursor.execute("""
-                SELECT id, name, age, condition, heart_rate, temperature, health_problem, treatment_required, medications, diet_plan 
-                FROM patients 
-                WHERE id = ?
-            """, (patient_id,))
-        except ValueError:
-            # If not an integer, search by name (partial match)
-            cursor.execute("""
-                SELECT id, name, age, condition, heart_rate, temperature, health_problem, treatment_required, medications, diet_plan 
-                FROM patients 
-                WHERE name LIKE ?
-            """, (f"%{search_term}%",))
-        
+
+        self.run_search(search_term)
+
+    def show_search_results(self, results):
         # Display results
-        results = cursor.fetchall()
-        for row in results:
-            self.tree.insert("", "end", values=row)
+        self.tree_task = None
+        self.grid.show_rows(results)
             
         # Show message if no results found
         if not results:
             messagebox.showinfo("Search Results", "No matching patients found")
 
+    @timed("load_patients")
     def load_patients(self):
-        """Load all patients into the Treeview"""
-        self.tree.delete(*self.tree.get_children())
-        cursor.execute("SELECT id, name, age, condition, heart_rate, temperature, health_problem, treatment_required, medications, diet_plan FROM patients")
-        for row in cursor.fetchall():
-            self.tree.insert("", "end", values=row)
+        """Load patients into the Treeview, one page at a time"""
+        if self.tree_task is not None:
+            self.tree_task.cancel()
+            self.tree_task = None
+        self.grid.reset()
+
+    @timed("export_to_excel")
+    def export_to_excel(self):
+        # Queued behind any debounced export so only one writes patients.xlsx at a time
+        self.exporter.export_now(on_done=self.export_done)
+
+    @timed("import_vitals")
+    def import_vitals(self):
+        file_path = filedialog.askopenfilename(filetypes=[("CSV Files", "*.csv")])
+        if file_path:
+            self.runner.submit(import_vitals, file_path,
+                               on_done=lambda count: messagebox.showinfo("Success", f"Imported {count} vital sign readings"),
+                               on_error=lambda e: messagebox.showerror("Error", f"Failed to import vitals: {e}"))
+
+    def export_done(self, row_count):
+        if row_count:
+            messagebox.showinfo("Success", "Patient data exported to patients.xlsx")
+        else:
+            messagebox.showwarning("No Data", "No patient data available to export.")
 
     def add_patient_window(self):
         add_win = tk.Toplevel(self.root)
@@ -332,6 +561,7 @@ class PatientApp:
         diet_plan_entry = tk.Entry(add_win, width=40)
         diet_plan_entry.pack()
 
+        @timed("save_patient")
         def save_patient():
             name = name_entry.get()
             age = age_entry.get()
@@ -345,21 +575,24 @@ class PatientApp:
                 messagebox.showerror("Error", "Treatment Required cannot be empty!")
                 return
 
-            heart_rate = 80
-            temperature = 37.0
+            # Disabled while the insert runs so a double click can't add the patient twice
+            save_button.config(state=tk.DISABLED)
+            self.runner.submit(add_patient, name, age, condition, health_problem, treatment, medications, diet_plan,
+                               on_done=patient_added, on_error=save_failed)
 
-            cursor.execute("""
-                INSERT INTO patients 
-                (name, age, condition, heart_rate, temperature, health_problem, treatment_required, medications, diet_plan) 
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (name, age, condition, heart_rate, temperature, health_problem, treatment, medications, diet_plan))
-            conn.commit()
-            export_to_excel()  # Update Excel file after adding a patient
+        def patient_added(patient_id):
+            self.exporter.mark_dirty()  # Queue an export with the new row
             messagebox.showinfo("Success", "Patient added successfully!")
             add_win.destroy()
             self.load_patients()
 
-        tk.Button(add_win, text="Save", command=save_patient).pack(pady=10)
+        def save_failed(e):
+            if save_button.winfo_exists():
+                save_button.config(state=tk.NORMAL)
+            self.show_db_error(e)
+
+        save_button = tk.Button(add_win, text="Save", command=save_patient)
+        save_button.pack(pady=10)
 
     def edit_patient_window(self):
         selected_item = self.tree.selection()
@@ -410,22 +643,29 @@ class PatientApp:
         diet_plan_entry.insert(0, patient_data[9] if len(patient_data) > 9 and patient_data[9] else "")
         diet_plan_entry.pack()
 
-        def update_patient():
-            cursor.execute("""
-                UPDATE patients 
-                SET name=?, age=?, condition=?, health_problem=?, treatment_required=?, medications=?, diet_plan=? 
-                WHERE id=?
-                """, (name_entry.get(), age_entry.get(), condition_entry.get(), health_problem_entry.get(), 
-                      treatment_entry.get(), medications_entry.get(), diet_plan_entry.get(), patient_id))
-            conn.commit()
-            export_to_excel()  # Update Excel file after updating a patient
+        @timed("update_patient")
+        def save_changes():
+            update_button.config(state=tk.DISABLED)
+            self.runner.submit(update_patient, patient_id, name_entry.get(), age_entry.get(),
+                               condition_entry.get(), health_problem_entry.get(), treatment_entry.get(),
+                               medications_entry.get(), diet_plan_entry.get(),
+                               on_done=patient_updated, on_error=update_failed)
+
+        def patient_updated(patient_id):
+            self.exporter.mark_dirty()  # Queue an export with the changed row
             messagebox.showinfo("Success", "Patient details updated!")
             edit_win.destroy()
             self.load_patients()
 
-        tk.Button(edit_win, text="Update", command=update_patient).pack(pady=10)
+        def update_failed(e):
+            if update_button.winfo_exists():
+                update_button.config(state=tk.NORMAL)
+            self.show_db_error(e)
+
+        update_button = tk.Button(edit_win, text="Update", command=save_changes)
+        update_button.pack(pady=10)
 
-if __name__ == "_main_":
+if __name__ == "__main__":
     root = tk.Tk()
     app = PatientApp(root)
     root.mainloop()
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# Body temperature (°C) at or above which a reading is flagged as fever
+FEVER_THRESHOLD = 38.0
+
+# (alert name, reading column, target column): alert when reading > target
+TARGET_RULES = [
+    ("High blood pressure", "Systolic_BP (mmHg)", "Target_Blood_Pressure"),
+    ("High heart rate", "Heart_Rate (bpm)", "Target_Heart_Rate"),
+]
+
+ALERT_COLUMNS = ["Patient_ID", "Timestamp", "Alert", "Value", "Target"]
+
+
+def _column(df, name):
+    # NaN for missing/blank readings, so every comparison involving them is False
+    return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _alert_rows(df, rows, name, values, targets):
+    return pd.DataFrame({
+        "Patient_ID": df["Patient_ID"].to_numpy()[rows],
+        "Timestamp": df["Timestamp"].to_numpy()[rows],
+        "Alert": name,
+        "Value": values,
+        "Target": targets,
+    })
+
+
+def evaluate_alerts(df, fever_threshold=FEVER_THRESHOLD):
+    """Compare every reading against its targets at once; returns one row per alert.
+
+    All checks are whole-column NumPy comparisons, so the cost is a few passes
+    over contiguous arrays rather than a Python loop over readings.
+    """
+    parts = []
+    for name, value_column, target_column in TARGET_RULES:
+        if value_column not in df.columns or target_column not in df.columns:
+            continue
+        values = _column(df, value_column)
+        targets = _column(df, target_column)
+        rows = np.flatnonzero(values > targets)
+        parts.append(_alert_rows(df, rows, name, values[rows], targets[rows]))
+
+    if "Temperature (°C)" in df.columns:
+        temperatures = _column(df, "Temperature (°C)")
+        rows = np.flatnonzero(temperatures >= fever_threshold)
+        parts.append(_alert_rows(df, rows, "Fever", temperatures[rows], np.full(len(rows), fever_threshold)))
+
+    if not parts:
+        return pd.DataFrame(columns=ALERT_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
+
+
+def scan_store(store, fever_threshold=FEVER_THRESHOLD):
+    """Evaluate alerts chunk by chunk over a PatientStore without materializing it"""
+    parts = [evaluate_alerts(chunk, fever_threshold) for chunk in store.chunks]
+    if not parts:
+        return pd.DataFrame(columns=ALERT_COLUMNS)
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,94 @@
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# bcrypt work factor for new password hashes (each +1 doubles the cost)
+BCRYPT_ROUNDS = int(os.environ.get("PHMS_BCRYPT_ROUNDS", "12"))
+
+# Concurrent bcrypt checks, and how many more may wait before logins are refused
+AUTH_WORKERS = 2
+AUTH_QUEUE = 16
+
+# How long a verified login is remembered, so unlocking again skips bcrypt
+SESSION_TTL = 300
+
+# Failed attempts allowed per username before it is locked out for LOCKOUT_SECONDS
+MAX_FAILURES = 5
+LOCKOUT_SECONDS = 30
+
+
+class RateLimited(Exception):
+    pass
+
+
+def hash_password(password, rounds=BCRYPT_ROUNDS):
+    import bcrypt  # deferred: only needed once a password is hashed or checked
+
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+class LoginVerifier:
+    """Checks passwords on a small dedicated pool so bcrypt never runs on the Tk thread.
+
+    fetch_user(username) returns a users row (id, username, password_hash, role)
+    or None and is called on the pool's threads. Successful logins are cached
+    for SESSION_TTL seconds as an HMAC of the password under a per-process key,
+    so the plaintext and the bcrypt hash are never held in the cache.
+    """
+
+    def __init__(self, fetch_user, max_workers=AUTH_WORKERS, max_queue=AUTH_QUEUE, session_ttl=SESSION_TTL):
+        self.fetch_user = fetch_user
+        self.session_ttl = session_ttl
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="phms-auth")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self._lock = threading.Lock()
+        self._key = secrets.token_bytes(32)
+        self._sessions = {}
+        self._failures = {}
+
+    def submit(self, username, password):
+        """Start verifying; the future resolves to the user's role, or None if rejected"""
+        if not self._slots.acquire(blocking=False):
+            raise RateLimited("Too many login attempts in progress, please try again")
+        future = self.executor.submit(self._verify, username, password)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def forget(self, username):
+        """Drop a cached session, e.g. on logout or password change"""
+        with self._lock:
+            self._sessions.pop(username, None)
+
+    def shutdown(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _verify(self, username, password):
+        now = time.monotonic()
+        digest = hmac.new(self._key, password.encode("utf-8"), hashlib.sha256).digest()
+
+        with self._lock:
+            locked_until = self._failures.get(username, (0, 0))[1]
+            if locked_until > now:
+                raise RateLimited(f"Too many failed attempts, try again in {int(locked_until - now) + 1}s")
+            session = self._sessions.get(username)
+            if session and session[2] > now and hmac.compare_digest(session[0], digest):
+                return session[1]
+
+        import bcrypt
+
+        user = self.fetch_user(username)
+        verified = user is not None and bcrypt.checkpw(password.encode("utf-8"), user[2].encode("utf-8"))
+
+        with self._lock:
+            if not verified:
+                count = self._failures.get(username, (0, 0))[0] + 1
+                self._failures[username] = (0, now + LOCKOUT_SECONDS) if count >= MAX_FAILURES else (count, 0)
+                self._sessions.pop(username, None)
+                return None
+            self._failures.pop(username, None)
+            self._sessions[username] = (digest, user[3], now + self.session_ttl)
+            return user[3]
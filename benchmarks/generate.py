@@ -0,0 +1,141 @@
+"""Synthetic datasets for the benchmarks, matching the vitals CSV schema and the patients table.
+
+    python -m benchmarks.generate small            # 10k rows
+    python -m benchmarks.generate medium large     # 1M and 10M rows
+    python -m benchmarks.generate 250000 --out /data/bench
+
+Each size writes vitals_<size>.csv and patients_<size>.db into --out. Data
+is generated in bounded chunks from a fixed seed, so every run of the same
+size produces the same files and memory stays flat for the 10M sets.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from migrations import migrate
+from patient_core import RECOMMENDATIONS
+from vitals_store import CSV_TIMESTAMP_FORMAT
+
+SIZES = {"small": 10_000, "medium": 1_000_000, "large": 10_000_000}
+
+DATA_DIR = "bench_data"
+
+# Rows generated and written per chunk
+CHUNK_ROWS = 500_000
+
+# Average readings per patient in the vitals CSV
+READINGS_PER_PATIENT = 20
+
+FIRST_PATIENT_ID = 1000
+
+BLOOD_TYPES = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+CONDITIONS = list(RECOMMENDATIONS)
+
+FIRST_NAMES = ["James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+               "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Priya", "Arjun",
+               "Navya", "Ravi", "Ananya", "Wei", "Mei", "Omar", "Fatima", "Carlos", "Sofia", "Kenji"]
+LAST_NAMES = ["Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+              "Hernandez", "Lopez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin", "Lee",
+              "Reddy", "Sharma", "Patel", "Kumar", "Chen", "Wang", "Khan", "Silva", "Tanaka", "Nguyen"]
+
+
+def parse_size(size):
+    """Row count for a size name (small/medium/large) or a plain number"""
+    return SIZES[size] if size in SIZES else int(size)
+
+
+def vitals_chunk(rng, start, rows, patients):
+    """One chunk of synthetic CSV rows (rows start..start+rows of the dataset)"""
+    minutes = (np.arange(start, start + rows) // patients) * 60 + rng.integers(0, 60, rows)
+    stamps = pd.Timestamp("2024-01-01") + pd.to_timedelta(minutes, unit="min")
+    return pd.DataFrame({
+        "Patient_ID": FIRST_PATIENT_ID + rng.integers(0, patients, rows),
+        "Timestamp": stamps.strftime(CSV_TIMESTAMP_FORMAT),
+        "Temperature (°C)": rng.normal(37.0, 0.6, rows).round(1),
+        "Systolic_BP (mmHg)": rng.integers(90, 181, rows),
+        "Diastolic_BP (mmHg)": rng.integers(60, 111, rows),
+        "Heart_Rate (bpm)": rng.integers(50, 131, rows),
+        "Target_Blood_Pressure": rng.choice([120, 130, 140], rows),
+        "Target_Heart_Rate": rng.choice([70, 80, 90], rows),
+        "Blood Type": rng.choice(BLOOD_TYPES, rows),
+        # Some rows have no condition, as in the real export
+        "Medical Condition": rng.choice(CONDITIONS + [""], rows, p=[0.95 / len(CONDITIONS)] * len(CONDITIONS) + [0.05]),
+    })
+
+
+def write_vitals_csv(path, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    rng = np.random.default_rng(seed)
+    patients = max(rows // READINGS_PER_PATIENT, 1)
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        for start in range(0, rows, chunk_rows):
+            chunk = vitals_chunk(rng, start, min(chunk_rows, rows - start), patients)
+            chunk.to_csv(handle, header=start == 0, index=False)
+
+
+def patient_rows(rng, rows):
+    names = (rng.choice(FIRST_NAMES, rows).astype(object) + " " + rng.choice(LAST_NAMES, rows).astype(object))
+    conditions = rng.choice(CONDITIONS, rows)
+    for name, age, condition, heart_rate, temperature in zip(
+            names, rng.integers(18, 95, rows).tolist(), conditions, rng.integers(55, 120, rows).tolist(),
+            rng.normal(37.0, 0.5, rows).round(1).tolist()):
+        advice = RECOMMENDATIONS[condition]
+        yield (name, age, condition, heart_rate, temperature, f"{condition} follow-up", advice["Treatment"][0],
+               ", ".join(advice["Medications"]), advice["Diet"][0])
+
+
+def write_patients_db(path, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    if os.path.exists(path):
+        os.remove(path)
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(path)
+    try:
+        migrate(conn)
+        with conn:
+            for start in range(0, rows, chunk_rows):
+                conn.executemany("INSERT INTO patients (name, age, condition, heart_rate, temperature, health_problem, "
+                                 "treatment_required, medications, diet_plan) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                 patient_rows(rng, min(chunk_rows, rows - start)))
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+def dataset_paths(size, data_dir=DATA_DIR):
+    return os.path.join(data_dir, f"vitals_{size}.csv"), os.path.join(data_dir, f"patients_{size}.db")
+
+
+def generate(size, data_dir=DATA_DIR, seed=0):
+    """Write both datasets for a size; returns their paths"""
+    rows = parse_size(size)
+    os.makedirs(data_dir, exist_ok=True)
+    csv_path, db_path = dataset_paths(size, data_dir)
+    write_vitals_csv(csv_path, rows, seed)
+    write_patients_db(db_path, rows, seed)
+    return csv_path, db_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic benchmark datasets")
+    parser.add_argument("sizes", nargs="+", help=f"{', '.join(f'{name} ({rows:,})' for name, rows in SIZES.items())} or a row count")
+    parser.add_argument("--out", default=DATA_DIR, help=f"output directory (default: {DATA_DIR})")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    for size in args.sizes:
+        started = time.perf_counter()
+        try:
+            csv_path, db_path = generate(size, args.out, args.seed)
+        except (OSError, sqlite3.Error, ValueError) as e:
+            print(f"Generating {size} failed: {e}", file=sys.stderr)
+            return 1
+        print(f"{size}: {csv_path}, {db_path} ({parse_size(size):,} rows, {time.perf_counter() - started:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""Benchmark the hot paths against a generated dataset and compare with stored baselines.
+
+    python -m benchmarks.generate small
+    python -m benchmarks.run small                      # compare with baselines/small.json
+    python -m benchmarks.run small --save               # record a new baseline
+    python -m benchmarks.run medium --only load_csv display_patient --fail-over 25
+
+Each operation reports latency percentiles, throughput (operations or rows
+per second) and the peak memory allocated during one run, measured in a
+separate tracemalloc pass so tracing doesn't skew the timings. Baselines
+are machine-specific; record them on the machine you compare on.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import patient_core
+from benchmarks.generate import FIRST_NAMES, LAST_NAMES, dataset_paths, parse_size
+from excel_export import full_export
+from patient_grid import fetch_page
+from patient_loader import load_patient_file, stream_csv
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+# Timed repetitions for per-lookup operations, and for whole-dataset operations
+LOOKUP_REPEAT = 200
+BULK_REPEAT = 3
+
+# A p50 latency this much worse than the baseline is reported as a regression
+DEFAULT_FAIL_OVER = 20.0
+
+
+class Operation:
+    """A benchmarked call, run() `repeat` times after one warm-up call.
+
+    `items` is how many rows or lookups one run() handles, for throughput.
+    """
+
+    def __init__(self, name, run, items=1, repeat=LOOKUP_REPEAT, unit="ops"):
+        self.name = name
+        self.run = run
+        self.items = items
+        self.repeat = repeat
+        self.unit = unit
+
+
+def measure(operation):
+    operation.run()  # warm-up: imports, caches, prepared statements
+    samples = []
+    for _ in range(operation.repeat):
+        started = time.perf_counter()
+        operation.run()
+        samples.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        operation.run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    samples = np.array(samples) * 1000
+    return {
+        "runs": operation.repeat,
+        "p50_ms": float(np.percentile(samples, 50)),
+        "p95_ms": float(np.percentile(samples, 95)),
+        "p99_ms": float(np.percentile(samples, 99)),
+        "mean_ms": float(samples.mean()),
+        "throughput": operation.items * 1000 / float(samples.mean()),
+        "unit": f"{operation.unit}/s",
+        "peak_mb": peak / 1024 ** 2,
+    }
+
+
+def build_operations(csv_path, db_path, rows, work_dir):
+    rng = np.random.default_rng(1)
+    bulk_repeat = BULK_REPEAT if rows <= 1_000_000 else 1
+
+    # The GUI paths, with their windows stripped away (see patient_core)
+    store, index = load_patient_file(csv_path)
+    patient_ids = np.unique(store.chunks[0]["Patient_ID"].to_numpy())
+    conn = sqlite3.connect(db_path)
+    use_fts = patient_core.has_search_index(conn)
+    max_id = conn.execute("SELECT MAX(id) FROM patients").fetchone()[0] or 1
+    added = []
+
+    def display_patient():
+        patient = patient_core.find_patient(store, index, "Patient ID", rng.choice(patient_ids))
+        patient_core.patient_report(patient)
+
+    def search_patients():
+        term = rng.choice(FIRST_NAMES) if rng.random() < 0.5 else rng.choice(LAST_NAMES)[:3]
+        patient_core.query_patients(conn, term, use_fts)
+
+    def load_patients():
+        # One grid page at a random keyset position, as when scrolling the dashboard
+        fetch_page(conn, patient_core.PATIENT_SELECT, after_id=int(rng.integers(0, max_id)))
+
+    def save_patient():
+        added.append(patient_core.add_patient(conn, "Bench Patient", 40, "Asthma", "benchmark", "Observation",
+                                              "Albuterol", "Anti-inflammatory foods"))
+
+    def cached_load():
+        load_patient_file(csv_path)
+
+    operations = [
+        Operation("load_csv", lambda: stream_csv(csv_path), items=rows, repeat=bulk_repeat, unit="rows"),
+        Operation("load_csv_cached", cached_load, items=rows, repeat=bulk_repeat, unit="rows"),
+        Operation("display_patient", display_patient),
+        Operation("search_patients", search_patients),
+        Operation("load_patients_page", load_patients),
+        Operation("save_patient", save_patient),
+        Operation("export_excel", lambda: full_export(conn, os.path.join(work_dir, "patients.xlsx")),
+                  items=rows, repeat=bulk_repeat, unit="rows"),
+    ]
+
+    def cleanup():
+        conn.executemany("DELETE FROM patients WHERE id = ?", [(patient_id,) for patient_id in added])
+        conn.commit()
+        conn.close()
+    return operations, cleanup
+
+
+def compare(results, baseline, fail_over):
+    """Print each operation against its baseline; returns the names that regressed"""
+    regressed = []
+    print(f"\n{'vs baseline':<20} {'p50':>10} {'throughput':>12} {'peak mem':>10}")
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            print(f"{name:<20} {'(new)':>10}")
+            continue
+        latency = 100 * (result["p50_ms"] / before["p50_ms"] - 1) if before["p50_ms"] else 0
+        throughput = 100 * (result["throughput"] / before["throughput"] - 1) if before["throughput"] else 0
+        memory = 100 * (result["peak_mb"] / before["peak_mb"] - 1) if before["peak_mb"] else 0
+        flag = "  REGRESSION" if latency > fail_over else ""
+        print(f"{name:<20} {latency:>+9.1f}% {throughput:>+11.1f}% {memory:>+9.1f}%{flag}")
+        if flag:
+            regressed.append(name)
+    return regressed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark load, lookup, search, paging, save and export")
+    parser.add_argument("size", help="dataset size generated with benchmarks.generate (small, medium, large or a row count)")
+    parser.add_argument("--data", default="bench_data", help="directory holding the generated datasets")
+    parser.add_argument("--only", nargs="+", metavar="OPERATION", help="run only these operations")
+    parser.add_argument("--save", action="store_true", help=f"store the results as the baseline in {BASELINE_DIR}")
+    parser.add_argument("--fail-over", type=float, default=DEFAULT_FAIL_OVER,
+                        help=f"exit 1 if a p50 latency regresses by more than this percent (default: {DEFAULT_FAIL_OVER})")
+    args = parser.parse_args(argv)
+
+    csv_path, db_path = dataset_paths(args.size, args.data)
+    if not (os.path.exists(csv_path) and os.path.exists(db_path)):
+        print(f"No {args.size} dataset in {args.data}; run: python -m benchmarks.generate {args.size}", file=sys.stderr)
+        return 1
+    rows = parse_size(args.size)
+
+    work_dir = tempfile.mkdtemp(prefix="phms-bench-")
+    try:
+        operations, cleanup = build_operations(csv_path, db_path, rows, work_dir)
+        try:
+            results = {}
+            print(f"{'operation':<20} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10} {'throughput':>16} {'peak MB':>9}")
+            for operation in operations:
+                if args.only and operation.name not in args.only:
+                    continue
+                result = results[operation.name] = measure(operation)
+                print(f"{operation.name:<20} {result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} {result['p99_ms']:>10.3f} "
+                      f"{result['throughput']:>11,.0f} {result['unit']:<6} {result['peak_mb']:>7.1f}", flush=True)
+        finally:
+            cleanup()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    baseline_path = os.path.join(BASELINE_DIR, f"{args.size}.json")
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as handle:
+            json.dump({"size": args.size, "rows": rows, "recorded": time.strftime("%Y-%m-%d"),
+                       "python": platform.python_version(), "machine": platform.machine(), "results": results},
+                      handle, indent=2)
+            handle.write("\n")
+        print(f"\nBaseline saved to {baseline_path}")
+        return 0
+
+    if os.path.exists(baseline_path):
+        with open(baseline_path, encoding="utf-8") as handle:
+            if compare(results, json.load(handle), args.fail_over):
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
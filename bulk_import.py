@@ -0,0 +1,40 @@
+import argparse
+import sqlite3
+import sys
+
+from migrations import migrate
+from vitals_store import bulk_load_vitals, BATCH_ROWS
+
+DEFAULT_DB = "patient_monitoring.db"
+
+
+# Print a one-line running total of rows and throughput
+def report(rows, seconds):
+    rate = rows / seconds if seconds else 0
+    print(f"\r{rows:,} rows  {seconds:.1f}s  {rate:,.0f} rows/sec", end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import a vitals dataset CSV into the patient database")
+    parser.add_argument("csv_file", help="dataset CSV (Patient_ID, Timestamp, Temperature, BP, Heart_Rate, ...)")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"SQLite database (default: {DEFAULT_DB})")
+    parser.add_argument("--batch", type=int, default=BATCH_ROWS, help=f"rows per executemany batch (default: {BATCH_ROWS})")
+    args = parser.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    try:
+        migrate(conn)
+        rows, seconds = bulk_load_vitals(conn, args.csv_file, batch_rows=args.batch, on_progress=report)
+    except (OSError, sqlite3.Error, ValueError) as e:
+        print(f"\nImport failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        conn.close()
+
+    print(file=sys.stderr)
+    print(f"Imported {rows:,} rows in {seconds:.2f}s ({rows / seconds if seconds else 0:,.0f} rows/sec)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
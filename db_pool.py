@@ -0,0 +1,66 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from metrics import TimedConnection
+
+# Seconds a connection waits on a locked database before raising
+BUSY_TIMEOUT = 10.0
+
+# Prepared statements kept per connection (keyed by SQL text)
+STATEMENT_CACHE = 256
+
+
+class ConnectionPool:
+    """Hands each thread its own long-lived SQLite connection to one database.
+
+    Connections are opened lazily on first use in a thread and reused after
+    that, so prepared statements stay cached across calls. The database runs
+    in WAL mode, which lets readers (dashboard, export, search) proceed while
+    a writer commits; writers queue on the busy timeout instead of failing.
+    Statements are timed into phms_sql_seconds (see metrics.TimedConnection).
+    """
+
+    def __init__(self, db_path, timeout=BUSY_TIMEOUT, cached_statements=STATEMENT_CACHE, factory=TimedConnection):
+        self.db_path = db_path
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.factory = factory
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+
+    def connection(self):
+        """The calling thread's connection, opened on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Commit on success, roll back on error"""
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def close_all(self):
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+    def _open(self):
+        # check_same_thread=False only so close_all() can run from the main
+        # thread; each connection is otherwise used by the thread that opened it
+        conn = sqlite3.connect(self.db_path, timeout=self.timeout,
+                               cached_statements=self.cached_statements, check_same_thread=False,
+                               factory=self.factory)
+        conn.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
@@ -0,0 +1,70 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox, ttk
+
+from metrics import METRICS, REGISTRY
+
+# How often the open window re-reads the histograms
+REFRESH_MS = 1000
+
+COLUMNS = ("Kind", "Name", "Count", "Mean ms", "p50 ms", "p95 ms", "p99 ms", "Max ms", "Total s")
+
+# Short names for the metric families in the Kind column
+KINDS = {metric: label for metric, (label, _) in METRICS.items()}
+
+
+class DiagnosticsWindow:
+    """Toplevel listing every timed callback, action, task, SQL statement and API route.
+
+    Rows are sorted by total time, so whatever the UI has spent the most
+    time on is at the top. Refreshes itself while open.
+    """
+
+    def __init__(self, parent, registry=REGISTRY):
+        self.registry = registry
+        self.window = tk.Toplevel(parent)
+        self.window.title("Diagnostics")
+        self.window.geometry("1000x400")
+
+        buttons = tk.Frame(self.window)
+        buttons.pack(fill=tk.X, pady=5)
+        tk.Button(buttons, text="Reset", command=self.reset).pack(side=tk.LEFT, padx=5)
+        tk.Button(buttons, text="Save Metrics...", command=self.save).pack(side=tk.LEFT, padx=5)
+
+        frame = tk.Frame(self.window)
+        frame.pack(expand=True, fill="both")
+        self.tree = ttk.Treeview(frame, columns=COLUMNS, show="headings")
+        scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        for column in COLUMNS:
+            self.tree.heading(column, text=column)
+            self.tree.column(column, width=420 if column == "Name" else 70, anchor=tk.W if column in ("Kind", "Name") else tk.E)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, expand=True, fill="both")
+
+        self.refresh()
+
+    def refresh(self):
+        if not self.window.winfo_exists():
+            return
+        rows = sorted(self.registry.snapshot(), key=lambda item: item[2].sum, reverse=True)
+        self.tree.delete(*self.tree.get_children())
+        for metric, label, histogram in rows:
+            self.tree.insert("", tk.END, values=(
+                KINDS.get(metric, metric), label, histogram.count,
+                f"{histogram.mean * 1000:.2f}", f"{histogram.quantile(0.5) * 1000:.2f}",
+                f"{histogram.quantile(0.95) * 1000:.2f}", f"{histogram.quantile(0.99) * 1000:.2f}",
+                f"{histogram.max * 1000:.2f}", f"{histogram.sum:.3f}"))
+        self.window.after(REFRESH_MS, self.refresh)
+
+    def reset(self):
+        self.registry.reset()
+        self.tree.delete(*self.tree.get_children())
+
+    def save(self):
+        path = filedialog.asksaveasfilename(parent=self.window, defaultextension=".prom",
+                                            filetypes=[("Prometheus text", "*.prom"), ("All files", "*.*")])
+        if path:
+            try:
+                self.registry.write_textfile(path)
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to save metrics: {e}", parent=self.window)
@@ -0,0 +1,207 @@
+import os
+import time
+
+from metrics import current_action
+from task_runner import POLL_MS
+
+EXPORT_COLUMNS = ["ID", "Name", "Age", "Condition", "Heart Rate", "Temperature",
+                  "Health Problem", "Treatment Required", "Medications", "Diet Plan"]
+
+EXPORT_SELECT = """
+    SELECT id, name, age, condition, heart_rate, temperature, health_problem, treatment_required, medications, diet_plan
+    FROM patients"""
+
+# Edits are collected for this long before one batched export runs
+EXPORT_DELAY_MS = 5000
+
+# Rows fetched per round trip (and per Parquet row group) when streaming CSV/Parquet exports
+EXPORT_BATCH = 10_000
+
+# Parquet column types, in EXPORT_COLUMNS order
+PARQUET_TYPES = ["int64", "string", "int64", "string", "int64", "float64",
+                 "string", "string", "string", "string"]
+
+
+def full_export(conn, file_path):
+    """Stream the whole patients table into a fresh workbook; returns the row count"""
+    # openpyxl is only imported once an export actually runs
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Sheet1")
+    sheet.append(EXPORT_COLUMNS)
+    count = 0
+    for row in conn.execute(EXPORT_SELECT + " ORDER BY id"):
+        sheet.append(row)
+        count += 1
+    # Saved even when empty, so the file always has the header row (like the CSV export)
+    _save(workbook, file_path)
+    return count
+
+
+def csv_export(conn, file_path):
+    """Stream the whole patients table into a CSV file; returns the row count"""
+    import csv
+
+    temp_path = file_path + ".tmp"
+    count = 0
+    with open(temp_path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(EXPORT_COLUMNS)
+        cursor = conn.execute(EXPORT_SELECT + " ORDER BY id")
+        for rows in iter(lambda: cursor.fetchmany(EXPORT_BATCH), []):
+            writer.writerows(rows)
+            count += len(rows)
+    os.replace(temp_path, file_path)
+    return count
+
+
+def parquet_export(conn, file_path):
+    """Stream the whole patients table into a Parquet file, one row group per batch; needs pyarrow"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([(name, getattr(pa, kind)()) for name, kind in zip(EXPORT_COLUMNS, PARQUET_TYPES)])
+    temp_path = file_path + ".tmp"
+    count = 0
+    with pq.ParquetWriter(temp_path, schema) as writer:
+        cursor = conn.execute(EXPORT_SELECT + " ORDER BY id")
+        for rows in iter(lambda: cursor.fetchmany(EXPORT_BATCH), []):
+            columns = [pa.array(values, type=field.type) for values, field in zip(zip(*rows), schema)]
+            writer.write_table(pa.Table.from_arrays(columns, schema=schema))
+            count += len(rows)
+    os.replace(temp_path, file_path)
+    return count
+
+
+# Export writer for each output file extension
+EXPORT_FORMATS = {
+    ".xlsx": full_export,
+    ".csv": csv_export,
+    ".parquet": parquet_export,
+}
+
+
+def _save(workbook, file_path):
+    # Write beside the target and swap in, so a crash never leaves a truncated file
+    temp_path = file_path + ".tmp"
+    workbook.save(temp_path)
+    os.replace(temp_path, file_path)
+
+
+class ExportScheduler:
+    """Rewrites the export in debounced batches as patients are edited.
+
+    connect() must return a connection usable on the calling worker thread
+    (e.g. ConnectionPool.connection). mark_dirty() is cheap and called from
+    the save path; the streaming full_export() runs on the TaskRunner's pool
+    EXPORT_DELAY_MS after the last edit, so a burst of edits costs one export
+    instead of one per save. export_now() serves manual exports through the
+    same queue, so only one export ever writes the file at a time.
+    finish() runs the last export on the pool as well, so closing the window
+    with edits pending doesn't freeze it.
+    """
+
+    def __init__(self, root, runner, connect, file_path, delay_ms=EXPORT_DELAY_MS, on_error=None):
+        self.root = root
+        self.runner = runner
+        self.connect = connect
+        self.file_path = file_path
+        self.delay_ms = delay_ms
+        self.on_error = on_error
+        self.dirty = False
+        self._timer = None
+        self._task = None
+        self._batch = False
+        self._requested = False
+        self._requested_by = None
+        self._waiters = []
+
+    def mark_dirty(self):
+        self.dirty = True
+        self._schedule()
+
+    def export_now(self, on_done=None):
+        """Export as soon as any running export finishes; on_done(row_count) runs on the Tk thread"""
+        self._requested = True
+        if self._requested_by is None:
+            # Time the export from the click, even if it has to wait for a running one
+            self._requested_by = (current_action(), time.perf_counter())
+        if on_done:
+            self._waiters.append(on_done)
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+        self.flush()
+
+    def finish(self, on_done):
+        """Export any pending edits, then call on_done(error) on the Tk thread.
+
+        The export runs on the pool while the window keeps repainting; error
+        is None or the exception the last export raised. Shut the runner
+        down from on_done, not before.
+        """
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+            self._timer = None
+        if self._running():
+            self.root.after(POLL_MS, self.finish, on_done)
+        elif self.dirty or self._requested:
+            # Go round again afterwards for edits saved while this export ran
+            self._start(lambda e: self._finish_failed(e, on_done), then=lambda: self.finish(on_done))
+        else:
+            on_done(None)
+
+    def _schedule(self):
+        if self._timer is not None:
+            self.root.after_cancel(self._timer)
+        self._timer = self.root.after(self.delay_ms, self.flush)
+
+    def _running(self):
+        """Whether an export is still running or has yet to deliver its result"""
+        if self._task is None:
+            return False
+        if self._task.cancelled and self._task.future.done():
+            # Cancelled tasks get no callbacks; keep their edits for the next export
+            self.dirty = self.dirty or self._batch
+            self._task = None
+            return False
+        return True
+
+    def flush(self):
+        self._timer = None
+        if self._running():
+            # One export at a time; pick up later edits once this one finishes
+            self._schedule()
+        elif self.dirty or self._requested:
+            self._start(self._failed)
+
+    def _start(self, on_error, then=None):
+        self._batch, self.dirty, self._requested = self.dirty, False, False
+        action, since = self._requested_by or (None, None)
+        self._requested_by = None
+        waiters, self._waiters = self._waiters, []
+        self._task = self.runner.submit(self._export, on_done=lambda count: self._done(count, waiters, then),
+                                        on_error=on_error, action=action, since=since)
+
+    def _export(self):
+        return full_export(self.connect(), self.file_path)
+
+    def _done(self, count, waiters, then=None):
+        self._task = None
+        for on_done in waiters:
+            on_done(count)
+        if then:
+            then()
+
+    def _finish_failed(self, e, on_done):
+        self._task = None
+        self.dirty = self.dirty or self._batch
+        on_done(e)
+
+    def _failed(self, e):
+        self._task = None
+        # Keep the edits and try again after the usual delay
+        self.dirty = self.dirty or self._batch
+        self._schedule()
+        if self.on_error:
+            self.on_error(e)
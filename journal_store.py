@@ -0,0 +1,197 @@
+from datetime import date, datetime
+
+# Journal entries shown per page in the history list
+HISTORY_PAGE = 30
+
+ENTRY_FIELDS = ("patient_id", "entry_date", "medication_adherence", "diet_compliance",
+                "symptoms", "side_effects", "mood", "notes")
+
+WEEKLY_FIELDS = ("patient_id", "week_start", "progress_summary", "medication_rate",
+                 "diet_rate", "challenges", "adjustments")
+
+
+def ensure_journal_tables(conn):
+    """Create the Learning Journal tables; the caller commits.
+
+    Both are WITHOUT ROWID tables keyed on (patient_id, date), so a patient's
+    history is one contiguous range of the primary key index.
+    """
+    conn.execute('''CREATE TABLE IF NOT EXISTS journal_entries (
+                        patient_id INTEGER NOT NULL REFERENCES patients(id) ON DELETE CASCADE,
+                        entry_date TEXT NOT NULL,
+                        medication_adherence INTEGER NOT NULL,
+                        diet_compliance INTEGER NOT NULL,
+                        symptoms TEXT,
+                        side_effects TEXT,
+                        mood INTEGER,
+                        notes TEXT,
+                        PRIMARY KEY (patient_id, entry_date)) WITHOUT ROWID''')
+
+    conn.execute('''CREATE TABLE IF NOT EXISTS journal_weekly (
+                        patient_id INTEGER NOT NULL REFERENCES patients(id) ON DELETE CASCADE,
+                        week_start TEXT NOT NULL,
+                        progress_summary TEXT,
+                        medication_rate INTEGER,
+                        diet_rate INTEGER,
+                        challenges TEXT,
+                        adjustments TEXT,
+                        PRIMARY KEY (patient_id, week_start)) WITHOUT ROWID''')
+
+
+# Rollup table -> SQL expression giving the period an entry_date falls in
+ROLLUP_PERIODS = {
+    "journal_weekly_rollup": ("week_start", "date({}, '-6 days', 'weekday 1')"),  # Monday of that week
+    "journal_monthly_rollup": ("month", "strftime('%Y-%m', {})"),
+}
+
+
+def ensure_journal_rollups(conn):
+    """Create the weekly/monthly rollup tables and the triggers that maintain them.
+
+    Every insert, update or delete on journal_entries adjusts the matching
+    rollup rows by +/- one day, so a weekly or monthly report is a primary
+    key lookup instead of an aggregation over raw entries. Existing entries
+    are backfilled once. The caller commits.
+    """
+    for table, (period, _) in ROLLUP_PERIODS.items():
+        conn.execute(f'''CREATE TABLE IF NOT EXISTS {table} (
+                            patient_id INTEGER NOT NULL,
+                            {period} TEXT NOT NULL,
+                            days INTEGER NOT NULL,
+                            medication_days INTEGER NOT NULL,
+                            diet_days INTEGER NOT NULL,
+                            mood_total INTEGER NOT NULL,
+                            mood_days INTEGER NOT NULL,
+                            PRIMARY KEY (patient_id, {period})) WITHOUT ROWID''')
+        # All patients for one period, for ward-wide reports
+        conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{period} ON {table}({period})")
+
+    add_new = "".join(_rollup_add(table, "new") for table in ROLLUP_PERIODS)
+    remove_old = "".join(_rollup_remove(table, "old") for table in ROLLUP_PERIODS)
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS journal_rollup_ai AFTER INSERT ON journal_entries BEGIN {add_new} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS journal_rollup_ad AFTER DELETE ON journal_entries BEGIN {remove_old} END")
+    conn.execute(f"CREATE TRIGGER IF NOT EXISTS journal_rollup_au AFTER UPDATE ON journal_entries BEGIN {remove_old}{add_new} END")
+
+    for table, (period, expression) in ROLLUP_PERIODS.items():
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f'''INSERT INTO {table}
+                            SELECT patient_id, {expression.format("entry_date")}, COUNT(*),
+                                   SUM(medication_adherence), SUM(diet_compliance),
+                                   COALESCE(SUM(mood), 0), COUNT(mood)
+                            FROM journal_entries GROUP BY 1, 2''')
+
+
+def _rollup_add(table, row):
+    period, expression = ROLLUP_PERIODS[table]
+    return f'''
+        INSERT INTO {table} VALUES ({row}.patient_id, {expression.format(row + ".entry_date")}, 1,
+                                    {row}.medication_adherence, {row}.diet_compliance,
+                                    COALESCE({row}.mood, 0), {row}.mood IS NOT NULL)
+        ON CONFLICT (patient_id, {period}) DO UPDATE SET
+            days = days + 1,
+            medication_days = medication_days + excluded.medication_days,
+            diet_days = diet_days + excluded.diet_days,
+            mood_total = mood_total + excluded.mood_total,
+            mood_days = mood_days + excluded.mood_days;'''
+
+
+def _rollup_remove(table, row):
+    period, expression = ROLLUP_PERIODS[table]
+    key = f"patient_id = {row}.patient_id AND {period} = {expression.format(row + '.entry_date')}"
+    return f'''
+        UPDATE {table} SET
+            days = days - 1,
+            medication_days = medication_days - {row}.medication_adherence,
+            diet_days = diet_days - {row}.diet_compliance,
+            mood_total = mood_total - COALESCE({row}.mood, 0),
+            mood_days = mood_days - ({row}.mood IS NOT NULL)
+        WHERE {key};
+        DELETE FROM {table} WHERE {key} AND days <= 0;'''
+
+
+def parse_date(value):
+    """Accept YYYY-MM-DD or DD-MM-YYYY (or a date) and return ISO YYYY-MM-DD"""
+    if isinstance(value, date):
+        return value.isoformat()
+    value = value.strip()
+    for fmt in ("%Y-%m-%d", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(value, fmt).date().isoformat()
+        except ValueError:
+            pass
+    raise ValueError(f"Invalid date '{value}', use YYYY-MM-DD")
+
+
+def _upsert_sql(table, fields, key_count):
+    columns = ", ".join(fields)
+    placeholders = ", ".join("?" * len(fields))
+    updates = ", ".join(f"{field} = excluded.{field}" for field in fields[key_count:])
+    return (f"INSERT INTO {table} ({columns}) VALUES ({placeholders}) "
+            f"ON CONFLICT ({', '.join(fields[:key_count])}) DO UPDATE SET {updates}")
+
+
+def save_entries(conn, entries):
+    """Insert or replace daily entries (tuples in ENTRY_FIELDS order) in one transaction"""
+    with conn:
+        conn.executemany(_upsert_sql("journal_entries", ENTRY_FIELDS, 2), entries)
+
+
+def save_weekly_summaries(conn, summaries):
+    """Insert or replace weekly summaries (tuples in WEEKLY_FIELDS order) in one transaction"""
+    with conn:
+        conn.executemany(_upsert_sql("journal_weekly", WEEKLY_FIELDS, 2), summaries)
+
+
+def entry_history(conn, patient_id, before=None, limit=HISTORY_PAGE):
+    """A page of a patient's daily entries, newest first, older than `before` if given"""
+    sql = f"SELECT {', '.join(ENTRY_FIELDS)} FROM journal_entries WHERE patient_id = ?"
+    params = [patient_id]
+    if before is not None:
+        sql += " AND entry_date < ?"
+        params.append(before)
+    return conn.execute(sql + " ORDER BY entry_date DESC LIMIT ?", params + [limit]).fetchall()
+
+
+def week_start(value):
+    """ISO date of the Monday starting the week that contains value"""
+    day = datetime.strptime(parse_date(value), "%Y-%m-%d").date()
+    return date.fromordinal(day.toordinal() - day.weekday()).isoformat()
+
+
+def _rollup_summary(row):
+    if row is None:
+        return None
+    days, medication_days, diet_days, mood_total, mood_days = row
+    return {
+        "days": days,
+        "medication_rate": round(100 * medication_days / days),
+        "diet_rate": round(100 * diet_days / days),
+        "average_mood": round(mood_total / mood_days, 1) if mood_days else None,
+    }
+
+
+def weekly_rollup(conn, patient_id, week):
+    """Compliance summary for the week containing `week`, or None if nothing was logged"""
+    row = conn.execute("SELECT days, medication_days, diet_days, mood_total, mood_days FROM journal_weekly_rollup "
+                       "WHERE patient_id = ? AND week_start = ?", (patient_id, week_start(week))).fetchone()
+    return _rollup_summary(row)
+
+
+def monthly_rollup(conn, patient_id, month):
+    """Compliance summary for a YYYY-MM month, or None if nothing was logged"""
+    row = conn.execute("SELECT days, medication_days, diet_days, mood_total, mood_days FROM journal_monthly_rollup "
+                       "WHERE patient_id = ? AND month = ?", (patient_id, month)).fetchone()
+    return _rollup_summary(row)
+
+
+def monthly_report(conn, month):
+    """{patient_id: summary} for every patient with entries in a YYYY-MM month"""
+    rows = conn.execute("SELECT patient_id, days, medication_days, diet_days, mood_total, mood_days "
+                        "FROM journal_monthly_rollup WHERE month = ? ORDER BY patient_id", (month,))
+    return {row[0]: _rollup_summary(row[1:]) for row in rows}
+
+
+def weekly_history(conn, patient_id, limit=HISTORY_PAGE):
+    """A patient's weekly summaries, newest first"""
+    return conn.execute(f"SELECT {', '.join(WEEKLY_FIELDS)} FROM journal_weekly WHERE patient_id = ? "
+                        "ORDER BY week_start DESC LIMIT ?", (patient_id, limit)).fetchall()
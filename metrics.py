@@ -0,0 +1,237 @@
+"""In-process latency histograms for Tk callbacks, background tasks, SQL and API requests.
+
+Timings are aggregated into fixed-bucket histograms as they happen (one
+lock, a bisect and a few additions per observation), so instrumentation
+can stay on in production. The registry renders Prometheus text, which
+is written to PHMS_METRICS_FILE (for a textfile collector), served at
+/metrics by patient_api, and shown in the diagnostics window.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+
+# Histogram bucket upper bounds in seconds (the Prometheus "le" labels)
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# metric -> (label name, help text)
+METRICS = {
+    "phms_callback_seconds": ("callback", "Time spent in Tk callbacks on the UI thread"),
+    "phms_task_seconds": ("task", "Time background tasks spent running on worker threads"),
+    "phms_action_seconds": ("action", "Time from a timed callback submitting work to its result being handled"),
+    "phms_sql_seconds": ("statement", "Time to execute SQL statements (excluding fetching later rows)"),
+    "phms_http_seconds": ("route", "Time to answer patient API requests"),
+}
+
+# Prometheus textfile written periodically by the GUIs when set
+METRICS_FILE = os.environ.get("PHMS_METRICS_FILE")
+METRICS_INTERVAL_MS = 15000
+
+# Longest SQL text kept as a label, and how many distinct statements have their label cached
+SQL_LABEL_CHARS = 120
+SQL_LABEL_CACHE = 1024
+
+
+class Histogram:
+    __slots__ = ("counts", "count", "sum", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def copy(self):
+        other = Histogram()
+        other.counts = list(self.counts)
+        other.count, other.sum, other.max = self.count, self.sum, self.max
+        return other
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q):
+        """Estimated q-quantile in seconds, interpolated within its bucket like histogram_quantile()"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for index, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                if index == len(BUCKETS):
+                    return self.max
+                lower = BUCKETS[index - 1] if index else 0.0
+                upper = min(BUCKETS[index], self.max)
+                return lower + (max(upper, lower) - lower) * (rank - seen) / count
+            seen += count
+        return self.max
+
+
+class MetricsRegistry:
+    """Histograms keyed by (metric, label value); safe to update from any thread"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+
+    def observe(self, metric, label, seconds):
+        key = (metric, label)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    def snapshot(self):
+        """[(metric, label, Histogram)] copies, for reading without holding the lock"""
+        with self._lock:
+            return [(metric, label, histogram.copy()) for (metric, label), histogram in self._histograms.items()]
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def prometheus_text(self):
+        by_metric = {}
+        for metric, label, histogram in sorted(self.snapshot(), key=lambda item: item[:2]):
+            by_metric.setdefault(metric, []).append((label, histogram))
+
+        lines = []
+        for metric, series in by_metric.items():
+            label_name, help_text = METRICS.get(metric, ("name", metric))
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} histogram"]
+            for label, histogram in series:
+                label = _escape(label)
+                cumulative = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                    cumulative += count
+                    lines.append(f'{metric}_bucket{{{label_name}="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'{metric}_sum{{{label_name}="{label}"}} {histogram.sum:.6f}')
+                lines.append(f'{metric}_count{{{label_name}="{label}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path):
+        """Write the Prometheus text atomically (textfile collectors may read at any time)"""
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as handle:
+            handle.write(self.prometheus_text())
+        os.replace(temp_path, path)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def observe(metric, label, seconds):
+    REGISTRY.observe(metric, label, seconds)
+
+
+_current = threading.local()
+
+
+def current_action():
+    """Name of the timed callback running on this thread, if any"""
+    return getattr(_current, "action", None)
+
+
+def timed(name, metric="phms_callback_seconds"):
+    """Decorator recording how long each call of the function takes.
+
+    While the call runs, name is the current_action(), so a TaskRunner
+    can also record how long the work it submits takes to complete.
+    """
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            outer = current_action()
+            _current.action = name
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                REGISTRY.observe(metric, name, time.perf_counter() - started)
+                _current.action = outer
+        return wrapper
+    return decorate
+
+
+def timed_call(metric, name, fn, *args):
+    """Call fn(*args), recording its duration"""
+    started = time.perf_counter()
+    try:
+        return fn(*args)
+    finally:
+        REGISTRY.observe(metric, name, time.perf_counter() - started)
+
+
+_sql_labels = {}
+_PLACEHOLDER_LIST = re.compile(r"\?(\s*,\s*\?)+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def sql_label(sql):
+    """Statement text normalized for use as a label: one line, "?, ?, ..." lists collapsed"""
+    label = _sql_labels.get(sql)
+    if label is None:
+        label = _PLACEHOLDER_LIST.sub("?, ...", _WHITESPACE.sub(" ", sql).strip())[:SQL_LABEL_CHARS]
+        if len(_sql_labels) < SQL_LABEL_CACHE:
+            _sql_labels[sql] = label
+    return label
+
+
+class TimedConnection(sqlite3.Connection):
+    """sqlite3 connection that records every execute() in phms_sql_seconds.
+
+    Pass as factory= to sqlite3.connect (ConnectionPool does). For SELECTs
+    the time covers preparing the statement and producing the first row.
+    """
+
+    def execute(self, sql, *args):
+        started = time.perf_counter()
+        try:
+            return super().execute(sql, *args)
+        finally:
+            REGISTRY.observe("phms_sql_seconds", sql_label(sql), time.perf_counter() - started)
+
+    def executemany(self, sql, *args):
+        started = time.perf_counter()
+        try:
+            return super().executemany(sql, *args)
+        finally:
+            REGISTRY.observe("phms_sql_seconds", sql_label(sql), time.perf_counter() - started)
+
+    def executescript(self, script):
+        started = time.perf_counter()
+        try:
+            return super().executescript(script)
+        finally:
+            REGISTRY.observe("phms_sql_seconds", sql_label(script), time.perf_counter() - started)
+
+
+def start_textfile_export(root, path=METRICS_FILE, interval_ms=METRICS_INTERVAL_MS):
+    """Rewrite the metrics file every interval_ms from the Tk loop; no-op if path is unset"""
+    if not path:
+        return
+
+    def export():
+        try:
+            REGISTRY.write_textfile(path)
+        except OSError:
+            pass  # best-effort; try again next interval
+        root.after(interval_ms, export)
+
+    root.after(interval_ms, export)
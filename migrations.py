@@ -0,0 +1,92 @@
+from journal_store import ensure_journal_rollups, ensure_journal_tables
+from patient_search import create_update_trigger, ensure_search_index
+from vitals_store import ensure_vitals_table
+
+
+def _table_columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def create_base_tables(conn):
+    conn.execute('''CREATE TABLE IF NOT EXISTS users (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        username TEXT UNIQUE NOT NULL,
+                        password TEXT NOT NULL,
+                        role TEXT NOT NULL)''')
+
+    conn.execute('''CREATE TABLE IF NOT EXISTS patients (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        name TEXT NOT NULL,
+                        age INTEGER NOT NULL,
+                        condition TEXT NOT NULL,
+                        heart_rate INTEGER,
+                        temperature REAL,
+                        health_problem TEXT,
+                        treatment_required TEXT NOT NULL,
+                        medications TEXT,
+                        diet_plan TEXT)''')
+
+    # Databases created before medications/diet_plan existed
+    columns = _table_columns(conn, "patients")
+    for column in ("medications", "diet_plan"):
+        if column not in columns:
+            conn.execute(f"ALTER TABLE patients ADD COLUMN {column} TEXT")
+
+
+def create_search_index(conn):
+    # Without FTS5 this is a no-op and searches fall back to LIKE
+    ensure_search_index(conn)
+
+
+def create_patient_indexes(conn):
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_name ON patients(name COLLATE NOCASE)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_patients_condition ON patients(condition)")
+
+
+# (version, description, step) in the order they are applied. Append new
+# steps at the end with the next version number; never edit or reorder
+# steps that have shipped.
+MIGRATIONS = [
+    (1, "users and patients tables", create_base_tables),
+    (2, "patients full-text search index", create_search_index),
+    (3, "vitals time-series table", ensure_vitals_table),
+    (4, "patients name and condition indexes", create_patient_indexes),
+    (5, "learning journal tables", ensure_journal_tables),
+    (6, "learning journal weekly and monthly rollups", ensure_journal_rollups),
+    (7, "re-index patients only when searched fields change", create_update_trigger),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply every migration newer than the database's PRAGMA user_version.
+
+    Each step runs in its own transaction together with the user_version
+    bump, so a failed step leaves the database at the last good version.
+    Returns the descriptions of the steps applied (empty when up to date).
+    """
+    if schema_version(conn) >= SCHEMA_VERSION:
+        return []
+
+    applied = []
+    for version, description, step in MIGRATIONS:
+        # BEGIN IMMEDIATE takes the write lock up front, so two processes
+        # starting together can't both apply the same step
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            step(conn)
+            conn.execute(f"PRAGMA user_version = {version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        applied.append(description)
+    return applied
@@ -0,0 +1,414 @@
+"""Local HTTP/JSON API over the patient database (and optionally a vitals dataset CSV).
+
+    python patient_api.py --db patient_monitoring.db --csv vitals.csv --port 8080
+
+GET  /patients?q=smith              search by name/condition (or ID), like the dashboard search
+GET  /patients/<id>                 one patient
+GET  /vitals/<id>?start=&end=       readings with start <= ts < end (ISO timestamps, both optional)
+GET  /vitals/<id>/latest            most recent reading
+GET  /recommendations[/<condition>] the condition -> medications/treatment/diet mapping
+GET  /dataset/<Patient_ID>          readings and recommendations from the --csv dataset
+POST /batch                         {"requests": ["/patients/1", "/vitals/1/latest", ...]}
+GET  /metrics                       request, SQL and task latency histograms (Prometheus text)
+
+Connections are kept alive (HTTP/1.1) until idle for KEEPALIVE_TIMEOUT.
+GET results are served through a small read-through cache, and concurrent
+misses for the same resource share one database query.
+"""
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import patient_core
+from bulk_import import DEFAULT_DB
+from db_pool import ConnectionPool
+from metrics import REGISTRY, observe
+from migrations import migrate
+from vitals_store import VITALS_FIELDS, latest_vitals, query_range
+
+API_HOST = "127.0.0.1"
+API_PORT = 8080
+
+# Idle seconds before a kept-alive connection is closed
+KEEPALIVE_TIMEOUT = 15
+
+# Largest request body accepted (POST /batch)
+MAX_BODY = 1024 ** 2
+
+# Most sub-requests in one POST /batch
+BATCH_MAX = 100
+
+# Read-through cache: entries kept, and seconds before a cached result is re-read
+CACHE_SIZE = 10_000
+CACHE_TTL = 5.0
+
+# Threads running SQLite queries (each with its own pooled connection)
+DB_WORKERS = 4
+
+PATIENT_FIELDS = ("id", "name", "age", "condition", "heart_rate", "temperature",
+                  "health_problem", "treatment_required", "medications", "diet_plan")
+
+# Methods and route labels for request timings; anything else is timed as "other"
+METHODS = {"GET", "POST"}
+ROUTES = {"/patients", "/patients/<id>", "/vitals/<id>", "/vitals/<id>/latest", "/recommendations",
+          "/recommendations/<id>", "/dataset/<id>", "/batch", "/metrics"}
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ApiError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class PlainText(str):
+    """A payload sent as text/plain instead of JSON"""
+    content_type = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _Failure:
+    """A cached ApiError: its type, status and message, raised afresh on every hit"""
+
+    __slots__ = ("error_type", "status", "message")
+
+    def __init__(self, error):
+        self.error_type = type(error)
+        self.status = error.status
+        self.message = str(error)
+
+    def error(self):
+        return self.error_type(self.status, self.message)
+
+
+class ReadThroughCache:
+    """LRU cache with a TTL whose misses are loaded once, however many requests wait on them.
+
+    ApiErrors of the `negative` types (e.g. "not found") are cached by status
+    and message, so repeated lookups of missing patients don't hit the
+    database. Only used from the event loop thread, so it needs no locking.
+    """
+
+    def __init__(self, size=CACHE_SIZE, ttl=CACHE_TTL, negative=()):
+        self.size = size
+        self.ttl = ttl
+        self.negative = negative
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._loading = {}
+
+    async def get(self, key, load):
+        """Return the cached value for key, or await load() (a coroutine function) and cache it"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > time.monotonic():
+            self._entries.move_to_end(key)
+            self.hits += 1
+            if isinstance(entry[0], _Failure):
+                # A new exception each time, so tracebacks don't pile up on a shared instance
+                raise entry[0].error()
+            return entry[0]
+
+        pending = self._loading.get(key)
+        if pending is None:
+            self.misses += 1
+            pending = asyncio.ensure_future(load())
+            self._loading[key] = pending
+            try:
+                # Shielded so a client hanging up doesn't cancel the load for other waiters
+                value = await asyncio.shield(pending)
+            except self.negative as e:
+                self._store(key, _Failure(e))
+                raise
+            finally:
+                del self._loading[key]
+            self._store(key, value)
+            return value
+        return await asyncio.shield(pending)
+
+    def _store(self, key, value):
+        self._entries[key] = (value, time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+
+def _patient(row):
+    return dict(zip(PATIENT_FIELDS, row))
+
+
+def _vitals(row):
+    return dict(zip(VITALS_FIELDS, row))
+
+
+def _int(value, name):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ApiError(400, f"{name} must be an integer")
+    if not patient_core.SQLITE_INT_MIN <= number <= patient_core.SQLITE_INT_MAX:
+        # Larger values overflow SQLite's 64-bit INTEGER when bound
+        raise ApiError(400, f"{name} is out of range")
+    return number
+
+
+def _route(target):
+    """Route label for a request path, with IDs replaced so each route is one histogram"""
+    parts = [part for part in urlsplit(target).path.split("/") if part]
+    shape = parts[:1] + ["<id>" for _ in parts[1:2]] + parts[2:]
+    route = "/" + "/".join(shape)
+    return route if route in ROUTES else "other"
+
+
+class PatientApiServer:
+    """Serves the routes listed in the module docstring from one asyncio loop.
+
+    SQLite queries run on a small thread pool through a ConnectionPool, so
+    the loop keeps accepting and answering cached requests while they run.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB, host=API_HOST, port=API_PORT, dataset=None,
+                 cache_size=CACHE_SIZE, cache_ttl=CACHE_TTL):
+        self.db = ConnectionPool(db_path)
+        self.host = host
+        self.port = port
+        self.dataset_path = dataset
+        self.dataset = None
+        self.cache = ReadThroughCache(cache_size, cache_ttl, negative=(ApiError,))
+        self.executor = ThreadPoolExecutor(max_workers=DB_WORKERS, thread_name_prefix="phms-api")
+        self.use_fts = False
+        self.requests = 0
+        self.server = None
+
+    # --- lifecycle -------------------------------------------------------
+
+    async def start(self):
+        self.use_fts = await self._run(self._prepare)
+        if self.dataset_path:
+            self.dataset = await self._run_plain(patient_core.load_patients, self.dataset_path)
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"Serving patient API on http://{self.host}:{self.port}", file=sys.stderr)
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.db.close_all()
+
+    @staticmethod
+    def _prepare(conn):
+        migrate(conn)
+        return patient_core.has_search_index(conn)
+
+    async def _run(self, query, *args):
+        """Run query(conn, *args) on a database thread"""
+        return await self._run_plain(lambda: query(self.db.connection(), *args))
+
+    async def _run_plain(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    # --- HTTP ------------------------------------------------------------
+
+    async def _handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    break
+                if not request_line.strip():
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "malformed request line"}, False)
+                    break
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "bad Content-Length"}, False)
+                    break
+                if length > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "request body too large"}, False)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method, target, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _respond(writer, status, payload, keep_alive):
+        if isinstance(payload, PlainText):
+            data, content_type = payload.encode("utf-8"), payload.content_type
+        else:
+            data, content_type = json.dumps(payload, default=str).encode("utf-8"), "application/json"
+        head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def dispatch(self, method, target, body=b""):
+        """Answer one request; returns (status, JSON-able payload or PlainText)"""
+        self.requests += 1
+        started = time.perf_counter()
+        try:
+            return await self._dispatch(method, target, body)
+        finally:
+            # Labels only come from fixed sets, so clients can't create new series
+            label = f"{method if method in METHODS else 'other'} {_route(target)}"
+            observe("phms_http_seconds", label, time.perf_counter() - started)
+
+    async def _dispatch(self, method, target, body):
+        try:
+            if method == "POST" and urlsplit(target).path == "/batch":
+                return 200, await self._batch(body)
+            if method != "GET":
+                raise ApiError(405, f"{method} not allowed")
+            return 200, await self._get(target)
+        except ApiError as e:
+            return e.status, {"error": str(e)}
+        except (sqlite3.Error, OSError) as e:
+            return 500, {"error": str(e)}
+        except Exception as e:
+            # Anything unexpected still gets a response instead of dropping the connection
+            print(f"Unhandled error for {method} {target}: {e!r}", file=sys.stderr)
+            return 500, {"error": "internal server error"}
+
+    async def _batch(self, body):
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise ApiError(400, "body must be JSON")
+        targets = request.get("requests") if isinstance(request, dict) else request
+        if not isinstance(targets, list) or not all(isinstance(target, str) for target in targets):
+            raise ApiError(400, 'expected {"requests": ["/path", ...]}')
+        if len(targets) > BATCH_MAX:
+            raise ApiError(400, f"at most {BATCH_MAX} requests per batch")
+
+        # Sub-requests run concurrently and share the cache (and in-flight loads)
+        results = await asyncio.gather(*(self.dispatch("GET", target) for target in targets))
+        return [{"path": target, "status": status, "body": payload}
+                for target, (status, payload) in zip(targets, results)]
+
+    async def _get(self, target):
+        url = urlsplit(target)
+        parts = [unquote(part) for part in url.path.strip("/").split("/") if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        if not parts:
+            raise ApiError(404, "not found")
+
+        if parts == ["metrics"]:
+            return PlainText(REGISTRY.prometheus_text())
+
+        if parts[0] == "recommendations" and len(parts) <= 2:
+            if len(parts) == 1:
+                return patient_core.RECOMMENDATIONS
+            return {"condition": parts[1], **patient_core.recommendations_for(parts[1])}
+
+        key = url.path + ("?" + url.query if url.query else "")
+        return await self.cache.get(key, lambda: self._load(parts, query))
+
+    async def _load(self, parts, query):
+        resource = parts[0]
+        if resource == "patients" and len(parts) == 1:
+            term = query.get("q", "").strip()
+            if not term:
+                raise ApiError(400, "q is required")
+            rows = await self._run(patient_core.query_patients, term, self.use_fts)
+            return [_patient(row) for row in rows]
+
+        if resource == "patients" and len(parts) == 2:
+            rows = await self._run(patient_core.query_patients_by_ids, [_int(parts[1], "patient id")])
+            if not rows:
+                raise ApiError(404, "patient not found")
+            return _patient(rows[0])
+
+        if resource == "vitals" and len(parts) == 3 and parts[2] == "latest":
+            row = await self._run(latest_vitals, _int(parts[1], "patient id"))
+            if row is None:
+                raise ApiError(404, "no readings for patient")
+            return _vitals(row)
+
+        if resource == "vitals" and len(parts) == 2:
+            rows = await self._run(query_range, _int(parts[1], "patient id"), query.get("start"), query.get("end"))
+            return [_vitals(row) for row in rows]
+
+        if resource == "dataset" and len(parts) == 2:
+            if self.dataset is None:
+                raise ApiError(404, "no dataset loaded (start with --csv)")
+            return await self._run_plain(self._dataset_patient, parts[1])
+
+        raise ApiError(404, "not found")
+
+    def _dataset_patient(self, patient_id):
+        store, index = self.dataset
+        patient = patient_core.find_patient(store, index, "Patient ID", patient_id)
+        if patient.empty:
+            raise ApiError(404, "patient not found")
+        condition = patient.iloc[0].get("Medical Condition")
+        return {
+            "patient_id": patient_id,
+            "condition": None if condition != condition else condition,  # NaN for a blank condition
+            "recommendations": patient_core.recommendations_for(condition),
+            "readings": json.loads(patient.to_json(orient="records", date_format="iso")),
+        }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve patient lookups as local HTTP/JSON")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"SQLite database (default: {DEFAULT_DB})")
+    parser.add_argument("--host", default=API_HOST, help=f"address to listen on (default: {API_HOST})")
+    parser.add_argument("--port", type=int, default=API_PORT, help=f"port (default: {API_PORT})")
+    parser.add_argument("--csv", help="vitals dataset CSV served under /dataset/<Patient_ID>")
+    args = parser.parse_args(argv)
+
+    api = PatientApiServer(args.db, args.host, args.port, dataset=args.csv)
+    try:
+        asyncio.run(api.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    except (OSError, sqlite3.Error, ValueError) as e:
+        print(f"API server failed: {e}", file=sys.stderr)
+        return 1
+    finally:
+        api.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
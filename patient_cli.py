@@ -0,0 +1,187 @@
+"""Command-line entry point for batch jobs: no Tk, no window, safe to run from cron.
+
+    python patient_cli.py import vitals.csv --db patient_monitoring.db
+    python patient_cli.py export patients.parquet
+    python patient_cli.py search "smith" asthma
+    python patient_cli.py lookup vitals.csv 8392 1064 --format csv
+    python patient_cli.py alerts vitals.csv --fever 38.5 --fail-on-alerts
+
+Results stream to stdout as they are produced; progress and summaries go
+to stderr. Exit codes are listed below.
+"""
+import argparse
+import csv
+import os
+import sqlite3
+import sys
+
+import patient_core
+from bulk_import import DEFAULT_DB, report
+from excel_export import EXPORT_COLUMNS, EXPORT_FORMATS
+from migrations import migrate
+from vitals_store import BATCH_ROWS, bulk_load_vitals
+
+# Exit codes
+EXIT_OK = 0
+EXIT_FAILED = 1          # bad input, I/O or database error
+EXIT_NOT_FOUND = 2       # lookup/search: at least one term matched nothing
+EXIT_ALERTS = 3          # alerts --fail-on-alerts: at least one alert was raised
+
+
+def _connect(db_path, create=False):
+    if not create and not os.path.exists(db_path):
+        raise FileNotFoundError(f"Database not found: {db_path}")
+    conn = sqlite3.connect(db_path)
+    migrate(conn)
+    return conn
+
+
+def _read_terms(terms, terms_file):
+    """Search terms from the command line, then one per line from terms_file ("-" for stdin)"""
+    yield from terms
+    if terms_file:
+        handle = sys.stdin if terms_file == "-" else open(terms_file, encoding="utf-8")
+        with handle:
+            for line in handle:
+                if line.strip():
+                    yield line.strip()
+
+
+def cmd_import(args):
+    conn = _connect(args.db, create=True)
+    try:
+        rows, seconds = bulk_load_vitals(conn, args.csv_file, batch_rows=args.batch, on_progress=report)
+    finally:
+        conn.close()
+    print(file=sys.stderr)
+    print(f"Imported {rows:,} rows in {seconds:.2f}s ({rows / seconds if seconds else 0:,.0f} rows/sec)")
+    return EXIT_OK
+
+
+def cmd_export(args):
+    conn = _connect(args.db)
+    try:
+        count = patient_core.export_patients(conn, args.output)
+    finally:
+        conn.close()
+    print(f"Exported {count:,} patients to {args.output}", file=sys.stderr)
+    return EXIT_OK
+
+
+def cmd_search(args):
+    conn = _connect(args.db)
+    writer = csv.writer(sys.stdout)
+    writer.writerow(["Search"] + EXPORT_COLUMNS)
+    missing = 0
+    try:
+        for term in _read_terms(args.terms, args.terms_file):
+            rows = patient_core.query_patients(conn, term)
+            if not rows:
+                missing += 1
+                print(f"No patients match '{term}'", file=sys.stderr)
+            writer.writerows([term, *row] for row in rows)
+            sys.stdout.flush()
+    finally:
+        conn.close()
+    return EXIT_NOT_FOUND if missing else EXIT_OK
+
+
+def cmd_lookup(args):
+    store, index = patient_core.load_patients(args.csv_file, memory_mapped=args.memory_mapped or None)
+    search_type = "Patient Name" if args.by == "name" else "Patient ID"
+    header = True
+    missing = 0
+    for term in _read_terms(args.terms, args.terms_file):
+        try:
+            patient = patient_core.find_patient(store, index, search_type, term)
+        except KeyError as e:
+            raise ValueError(f"Column not found: {e}")
+        if patient.empty:
+            missing += 1
+            print(f"Patient not found: {term}", file=sys.stderr)
+        elif args.format == "csv":
+            patient.to_csv(sys.stdout, header=header, index=False, lineterminator="\n")
+            header = False
+        else:
+            sys.stdout.write(patient_core.patient_report(patient) + "\n")
+        sys.stdout.flush()
+    return EXIT_NOT_FOUND if missing else EXIT_OK
+
+
+def cmd_alerts(args):
+    from alerts import ALERT_COLUMNS, FEVER_THRESHOLD, evaluate_alerts
+
+    writer = csv.writer(sys.stdout)
+    writer.writerow(ALERT_COLUMNS)
+    counts = {}
+    readings = 0
+    # Alerts are written chunk by chunk as the CSV is parsed, so output starts before the scan ends
+    for chunk in patient_core.scan_patients(args.csv_file, memory_mapped=args.memory_mapped or None):
+        alerts = evaluate_alerts(chunk, FEVER_THRESHOLD if args.fever is None else args.fever)
+        writer.writerows(alerts.itertuples(index=False))
+        sys.stdout.flush()
+        readings += len(chunk)
+        for name, count in alerts["Alert"].value_counts().items():
+            counts[name] = counts.get(name, 0) + int(count)
+
+    print(f"Alerts: {sum(counts.values())} across {readings} readings", file=sys.stderr)
+    for name, count in counts.items():
+        print(f"  {name}: {count}", file=sys.stderr)
+    return EXIT_ALERTS if counts and args.fail_on_alerts else EXIT_OK
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Patient Health Monitoring System batch commands")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"SQLite database (default: {DEFAULT_DB})")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("import", help="bulk import a vitals dataset CSV into the database")
+    command.add_argument("csv_file")
+    command.add_argument("--batch", type=int, default=BATCH_ROWS, help=f"rows per batch (default: {BATCH_ROWS})")
+    command.set_defaults(run=cmd_import)
+
+    command = commands.add_parser("export", help="export the patients table")
+    command.add_argument("output", help=f"output file; format from the extension ({', '.join(EXPORT_FORMATS)})")
+    command.set_defaults(run=cmd_export)
+
+    command = commands.add_parser("search", help="search patients in the database by ID, name or condition (CSV to stdout)")
+    command.add_argument("terms", nargs="*")
+    command.add_argument("--terms-file", help='file with one term per line ("-" for stdin)')
+    command.set_defaults(run=cmd_search)
+
+    command = commands.add_parser("lookup", help="look up patients in a vitals dataset CSV")
+    command.add_argument("csv_file")
+    command.add_argument("terms", nargs="*")
+    command.add_argument("--terms-file", help='file with one ID/name per line ("-" for stdin)')
+    command.add_argument("--by", choices=["id", "name"], default="id")
+    command.add_argument("--format", choices=["text", "csv"], default="text",
+                         help="text: report per patient; csv: the matching readings")
+    command.add_argument("--memory-mapped", action="store_true", help="use the memory-mapped store")
+    command.set_defaults(run=cmd_lookup)
+
+    command = commands.add_parser("alerts", help="scan a vitals dataset CSV for readings above target (CSV to stdout)")
+    command.add_argument("csv_file")
+    command.add_argument("--fever", type=float, help="fever threshold in °C (default: alerts.FEVER_THRESHOLD, 38.0)")
+    command.add_argument("--fail-on-alerts", action="store_true", help=f"exit with {EXIT_ALERTS} if any alert is raised")
+    command.add_argument("--memory-mapped", action="store_true", help="use the memory-mapped store")
+    command.set_defaults(run=cmd_alerts)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.run(args)
+    except BrokenPipeError:
+        # Output piped into head/grep that exited early. The command didn't finish,
+        # so its result is unknown: never report success. Point stdout at devnull
+        # so the interpreter's final flush doesn't raise again.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return EXIT_FAILED
+    except (OSError, sqlite3.Error, ValueError, ImportError) as e:
+        print(f"\n{args.command} failed: {e}", file=sys.stderr)
+        return EXIT_FAILED
+
+
+if __name__ == "__main__":
+    sys.exit(main())
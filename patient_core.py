@@ -0,0 +1,283 @@
+"""Patient data and recommendation logic shared by the GUIs, batch jobs and services.
+
+Importing this module has no side effects: nothing opens a window or a
+database, and pandas-backed modules are imported only when a function
+that needs them is called, so headless callers start quickly.
+"""
+import os
+
+from auth import hash_password
+from excel_export import EXPORT_FORMATS
+from migrations import migrate
+from patient_search import search_patients
+
+# Most alerts listed in an alert report
+ALERTS_SHOWN = 100
+
+# Patients listed in a trend report
+TRENDS_SHOWN = 20
+
+# Updated recommendations for specific medical conditions
+RECOMMENDATIONS = {
+    "Cancer": {
+        "Medications": ["Cyclophosphamide", "Methotrexate"],
+        "Treatment": ["Chemotherapy", "Radiation therapy", "Immunotherapy", "Surgery if needed"],
+        "Diet": ["High-protein diet", "Nutrient-dense foods", "Avoid processed foods"]
+    },
+    "Obesity": {
+        "Medications": ["Orlistat", "Phentermine (if prescribed)"],
+        "Treatment": ["Weight management programs", "Physical activity", "Lifestyle changes"],
+        "Diet": ["Low-calorie, high-fiber diet", "Avoid sugary and processed foods"]
+    },
+    "Diabetes": {
+        "Medications": ["Metformin", "Insulin if needed"],
+        "Treatment": ["Blood sugar monitoring", "Exercise", "Regular check-ups"],
+        "Diet": ["Low-carb, high-protein diet", "Avoid sugary foods and drinks"]
+    },
+    "Asthma": {
+        "Medications": ["Albuterol", "Salbutamol", "Corticosteroids"],
+        "Treatment": ["Breathing exercises", "Avoid allergens", "Use air purifiers"],
+        "Diet": ["Anti-inflammatory foods", "Avoid dairy and processed foods"]
+    },
+    "Hypertension": {
+        "Medications": ["Amlodipine", "Losartan", "Beta-blockers"],
+        "Treatment": ["Stress management", "Regular exercise", "Adequate sleep"],
+        "Diet": ["Low-sodium diet", "Potassium-rich foods like bananas and spinach"]
+    },
+    "Arthritis": {
+        "Medications": ["Ibuprofen", "Naproxen", "Methotrexate"],
+        "Treatment": ["Physical therapy", "Joint exercises", "Heat/cold therapy"],
+        "Diet": ["Anti-inflammatory foods", "Omega-3 rich foods", "Avoid processed sugar"]
+    }
+}
+
+# Shown when a condition has no recommendation of that kind
+NO_RECOMMENDATION = {
+    "Medications": ["No medication available"],
+    "Treatment": ["No treatment available"],
+    "Diet": ["No diet recommendation available"],
+}
+
+# Columns returned by patient queries against the SQLite database
+PATIENT_SELECT = """
+    SELECT id, name, age, condition, heart_rate, temperature, health_problem, treatment_required, medications, diet_plan
+    FROM patients"""
+
+DEFAULT_DOCTOR = ("doctor1", "password123")
+
+# Range of an SQLite INTEGER (signed 64-bit); larger ints overflow when bound
+SQLITE_INT_MIN = -2 ** 63
+SQLITE_INT_MAX = 2 ** 63 - 1
+
+# Readings recorded for a newly added patient until live vitals arrive
+DEFAULT_HEART_RATE = 80
+DEFAULT_TEMPERATURE = 37.0
+
+
+# ---------------------------------------------------------------------------
+# Recommendations
+
+def recommendations_for(condition):
+    """Medications, treatment and diet lists for a medical condition"""
+    known = RECOMMENDATIONS.get(condition, {})
+    return {kind: known.get(kind, default) for kind, default in NO_RECOMMENDATION.items()}
+
+
+# ---------------------------------------------------------------------------
+# Vitals datasets (CSV)
+
+def load_patients(file_path, memory_mapped=None, on_progress=None, cancel_event=None):
+    """Load a vitals CSV; returns a (store, index) pair.
+
+    memory_mapped=None picks the memory-mapped store for files of
+    MMAP_MIN_BYTES or more and the in-memory store (via its binary cache)
+    otherwise.
+    """
+    from vitals_mmap import MMAP_MIN_BYTES, open_mmap_store
+
+    if memory_mapped is None:
+        memory_mapped = os.path.getsize(file_path) >= MMAP_MIN_BYTES
+    if memory_mapped:
+        return open_mmap_store(file_path, on_progress=on_progress, cancel_event=cancel_event)
+
+    from patient_loader import load_patient_file
+    return load_patient_file(file_path, on_progress=on_progress, cancel_event=cancel_event)
+
+
+def scan_patients(file_path, memory_mapped=None):
+    """Yield a vitals CSV's readings as DataFrame chunks for a single pass.
+
+    Unlike load_patients(), nothing is kept or cached in memory: the CSV is
+    parsed one chunk at a time, or the memory-mapped store (picked as in
+    load_patients()) is read a chunk at a time.
+    """
+    from vitals_mmap import MMAP_MIN_BYTES, open_mmap_store
+
+    if memory_mapped is None:
+        memory_mapped = os.path.getsize(file_path) >= MMAP_MIN_BYTES
+    if memory_mapped:
+        store, _ = open_mmap_store(file_path)
+        return store.chunks
+
+    from patient_loader import iter_csv_chunks
+    return iter_csv_chunks(file_path)
+
+
+def find_patient(store, index, search_type, value):
+    """All readings matching a search ("Patient Name" or "Patient ID"), as a DataFrame"""
+    from patient_index import SEARCH_COLUMNS
+
+    if search_type not in SEARCH_COLUMNS:
+        raise ValueError(f"Invalid search type '{search_type}'")
+    return store.take(index.lookup(search_type, str(value).strip()))
+
+
+def patient_report(patient):
+    """Text report for one patient's readings: recommendations, alerts and trends"""
+    from alerts import evaluate_alerts
+    from trends import ROLLING_WINDOW, TREND_COLUMNS, rolling_trends, trend_summary
+
+    first = patient.iloc[0]
+    condition = first.get('Medical Condition', 'N/A')
+    advice = recommendations_for(condition)
+    lines = [
+        f"Patient Name: {first.get('Name', 'N/A')}",
+        f"Patient ID: {first.get('Patient_ID', 'N/A')}",
+        f"Medical Condition: {condition}",
+        "",
+        f"Medications: {', '.join(advice['Medications'])}",
+        f"Treatment: {', '.join(advice['Treatment'])}",
+        f"Diet: {', '.join(advice['Diet'])}",
+    ]
+
+    # Readings above the patient's targets
+    patient_alerts = evaluate_alerts(patient)
+    if not patient_alerts.empty:
+        lines += ["", f"Alerts ({len(patient_alerts)}):"]
+        for alert in patient_alerts.itertuples(index=False):
+            lines.append(f"{alert.Timestamp}  {alert.Alert}: {alert.Value:g} (target {alert.Target:g})")
+
+    # Trends across all of the patient's readings, not just the first row
+    trends = trend_summary(patient)
+    if not trends.empty:
+        latest = rolling_trends(patient).iloc[-1]
+        stats = trends.iloc[0]
+        lines += ["", f"Trends ({len(patient)} readings, last {ROLLING_WINDOW} averaged):"]
+        for column, label in TREND_COLUMNS.items():
+            if column in trends.columns:
+                lines.append(f"{label}: recent {latest[(column, 'mean')]:.1f} "
+                             f"(range {latest[(column, 'min')]:.1f}-{latest[(column, 'max')]:.1f}), "
+                             f"overall {stats[(column, 'mean')]:.1f}, variance {stats[(column, 'var')]:.2f}, "
+                             f"slope {stats[(column, 'slope')]:+.2f}/day")
+    return "\n".join(lines) + "\n"
+
+
+def alert_report(alerts, reading_count, limit=ALERTS_SHOWN):
+    """Text summary of an alert scan: counts per alert type, then the first `limit` alerts"""
+    lines = [f"Alerts: {len(alerts)} across {reading_count} readings"]
+    for name, count in alerts['Alert'].value_counts().items():
+        lines.append(f"  {name}: {count}")
+    lines.append("")
+    for alert in alerts.head(limit).itertuples(index=False):
+        lines.append(f"{alert.Patient_ID}  {alert.Timestamp}  {alert.Alert}: {alert.Value:g} (target {alert.Target:g})")
+    if len(alerts) > limit:
+        lines.append(f"... and {len(alerts) - limit} more")
+    return "\n".join(lines) + "\n"
+
+
+def trend_report(trends, limit=TRENDS_SHOWN):
+    """Text summary of a trend scan: the patients whose systolic BP is rising fastest"""
+    lines = [f"Trends for {len(trends)} patients"]
+    column = "Systolic_BP (mmHg)"
+    if column in trends.columns:
+        rising = trends[column].dropna(subset=["slope"]).sort_values("slope", ascending=False).head(limit)
+        lines += ["", "Fastest rising systolic BP:"]
+        for patient_id, stats in rising.iterrows():
+            lines.append(f"{patient_id}  {stats['slope']:+.2f} mmHg/day over {int(stats['count'])} readings "
+                         f"(mean {stats['mean']:.1f}, range {stats['min']:.0f}-{stats['max']:.0f})")
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------------------------------------------------------
+# Patient database (SQLite); every function takes an open connection
+
+def has_search_index(conn):
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'patients_fts'").fetchone() is not None
+
+
+def add_default_doctor(conn):
+    """Create the default doctor login if there are no users; returns True if it was created"""
+    if conn.execute("SELECT COUNT(*) FROM users").fetchone()[0]:
+        return False
+    username, password = DEFAULT_DOCTOR
+    conn.execute("INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+                 (username, hash_password(password), "doctor"))
+    conn.commit()
+    return True
+
+
+def prepare_database(conn):
+    """Bring the schema up to date and seed the default doctor.
+
+    Returns the descriptions of the migrations applied.
+    """
+    applied = migrate(conn)
+    add_default_doctor(conn)
+    return applied
+
+
+def query_patients(conn, search_term, use_fts=None):
+    """Patients matching an ID (exact) or a name/condition search term.
+
+    Integers outside SQLite's INTEGER range can't be ids, so they are
+    searched as text like any other term.
+    """
+    try:
+        patient_id = int(search_term)
+    except ValueError:
+        patient_id = None
+    if patient_id is not None and SQLITE_INT_MIN <= patient_id <= SQLITE_INT_MAX:
+        return conn.execute(PATIENT_SELECT + " WHERE id = ?", (patient_id,)).fetchall()
+    if use_fts is None:
+        use_fts = has_search_index(conn)
+    if use_fts:
+        # Ranked prefix match across the indexed text fields
+        return search_patients(conn, PATIENT_SELECT, search_term)
+    return conn.execute(PATIENT_SELECT + " WHERE name LIKE ?", (f"%{search_term}%",)).fetchall()
+
+
+def query_patients_by_ids(conn, patient_ids):
+    patient_ids = list(patient_ids)
+    placeholders = ", ".join("?" * len(patient_ids))
+    return conn.execute(PATIENT_SELECT + f" WHERE id IN ({placeholders})", patient_ids).fetchall()
+
+
+def add_patient(conn, name, age, condition, health_problem, treatment, medications, diet_plan):
+    """Insert a patient with default readings and commit; returns the new id"""
+    cursor = conn.execute("""
+        INSERT INTO patients
+        (name, age, condition, heart_rate, temperature, health_problem, treatment_required, medications, diet_plan)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (name, age, condition, DEFAULT_HEART_RATE, DEFAULT_TEMPERATURE, health_problem, treatment,
+              medications, diet_plan))
+    conn.commit()
+    return cursor.lastrowid
+
+
+def update_patient(conn, patient_id, name, age, condition, health_problem, treatment, medications, diet_plan):
+    """Update a patient's details (not their readings) and commit"""
+    conn.execute("""
+        UPDATE patients
+        SET name=?, age=?, condition=?, health_problem=?, treatment_required=?, medications=?, diet_plan=?
+        WHERE id=?
+        """, (name, age, condition, health_problem, treatment, medications, diet_plan, patient_id))
+    conn.commit()
+
+
+def export_patients(conn, path):
+    """Write every patient to an .xlsx, .csv or .parquet file (by extension); returns the row count"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format '{extension}', use one of {', '.join(EXPORT_FORMATS)}")
+    return EXPORT_FORMATS[extension](conn, path)
@@ -0,0 +1,136 @@
+import tkinter as tk
+from tkinter import ttk
+
+# Rows fetched per page, and how many pages stay materialized in the Treeview
+PAGE_SIZE = 200
+MAX_PAGES = 3
+
+# Fetch another page when the view is this close to either edge
+EDGE_FRACTION = 0.1
+
+
+def fetch_page(conn, select_sql, after_id=None, before_id=None, limit=PAGE_SIZE):
+    """Keyset-paginate select_sql on patients.id; rows are always returned in id order"""
+    if before_id is not None:
+        rows = conn.execute(select_sql + " WHERE id < ? ORDER BY id DESC LIMIT ?", (before_id, limit)).fetchall()
+        rows.reverse()
+        return rows
+    if after_id is None:
+        return conn.execute(select_sql + " ORDER BY id LIMIT ?", (limit,)).fetchall()
+    return conn.execute(select_sql + " WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)).fetchall()
+
+
+class PagedPatientGrid:
+    """Treeview that only materializes a sliding window of patient rows.
+
+    fetch(after_id, before_id) runs on the TaskRunner's pool and returns one
+    page of rows (first column = patients.id). Scrolling near the bottom
+    fetches the next page and drops the oldest one from the top, and vice
+    versa, so memory and insert time stay constant however large the table is.
+    """
+
+    def __init__(self, parent, columns, runner, fetch, on_error=None, page_size=PAGE_SIZE, max_pages=MAX_PAGES):
+        self.runner = runner
+        self.fetch = fetch
+        self.on_error = on_error
+        self.page_size = page_size
+        self.max_rows = page_size * max_pages
+
+        frame = tk.Frame(parent)
+        frame.pack(expand=True, fill="both")
+
+        self.tree = ttk.Treeview(frame, columns=columns, show="headings")
+        self.scrollbar = ttk.Scrollbar(frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, expand=True, fill="both")
+
+        self.paging = False
+        self.at_start = True
+        self.at_end = True
+        self.task = None
+
+    def reset(self):
+        """Show the first page of the whole table"""
+        self._cancel()
+        self.tree.delete(*self.tree.get_children())
+        self.paging = True
+        self.at_start = True
+        self.at_end = False
+        self._request(None, None)
+
+    def show_rows(self, rows):
+        """Show a fixed result set (e.g. search results) with paging switched off"""
+        self._cancel()
+        self.paging = False
+        self.tree.delete(*self.tree.get_children())
+        for row in rows:
+            self.tree.insert("", "end", iid=str(row[0]), values=row)
+
+    def refresh_rows(self, rows):
+        """Redraw rows that are currently materialized; others are picked up when paged in"""
+        for row in rows:
+            iid = str(row[0])
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=row)
+
+    def _cancel(self):
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+    def _request(self, after_id, before_id):
+        self.task = self.runner.submit(self.fetch, after_id, before_id,
+                                       on_done=lambda rows: self._page_loaded(rows, before_id is not None),
+                                       on_error=self._page_failed)
+
+    def _page_failed(self, e):
+        self.task = None
+        self.paging = False
+        if self.on_error:
+            self.on_error(e)
+
+    def _on_scroll(self, first, last):
+        self.scrollbar.set(first, last)
+        if self.task is not None and self.task.cancelled:
+            # Cancelled from outside (e.g. the Cancel button); its page will never arrive
+            self.task = None
+        if not self.paging or self.task is not None:
+            return
+        items = self.tree.get_children()
+        if not items:
+            return
+        if float(last) >= 1 - EDGE_FRACTION and not self.at_end:
+            self._request(int(items[-1]), None)
+        elif float(first) <= EDGE_FRACTION and not self.at_start:
+            self._request(None, int(items[0]))
+
+    def _page_loaded(self, rows, backwards):
+        self.task = None
+        items = self.tree.get_children()
+        top_index = int(float(self.tree.yview()[0]) * len(items)) if items else 0
+
+        if backwards:
+            for position, row in enumerate(rows):
+                self.tree.insert("", position, iid=str(row[0]), values=row)
+            top_index += len(rows)
+            self.at_start = len(rows) < self.page_size
+            overflow = list(self.tree.get_children()[self.max_rows:])
+            if overflow:
+                self.tree.delete(*overflow)
+                self.at_end = False
+        else:
+            for row in rows:
+                self.tree.insert("", "end", iid=str(row[0]), values=row)
+            self.at_end = len(rows) < self.page_size
+            children = self.tree.get_children()
+            overflow = list(children[:max(0, len(children) - self.max_rows)])
+            if overflow:
+                self.tree.delete(*overflow)
+                top_index -= len(overflow)
+                self.at_start = False
+
+        # Keep the rows the user was looking at in place after trimming
+        remaining = len(self.tree.get_children())
+        if remaining:
+            self.tree.yview_moveto(max(0, top_index) / remaining)
@@ -0,0 +1,64 @@
+import numpy as np
+
+# Search types offered in the GUI and the CSV column each one is keyed on
+SEARCH_COLUMNS = {
+    "Patient Name": "Name",
+    "Patient ID": "Patient_ID",
+}
+
+
+def normalize_key(search_type, value):
+    """Normalize a search value the same way the index keys were built"""
+    value = str(value)
+    if search_type == "Patient Name":
+        return value.lower()
+    return value
+
+
+class PatientIndex:
+    """Hash maps from normalized name / Patient_ID to row positions in the loaded data.
+
+    The index is built once when data is loaded and extended with add_rows()
+    whenever more rows are appended, so lookups never scan the DataFrame.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._maps = {search_type: {} for search_type in SEARCH_COLUMNS}
+        self._indexed = set()
+        self.row_count = 0
+
+    def rebuild(self, df):
+        self.clear()
+        self.add_rows(df)
+
+    def add_rows(self, df):
+        """Index rows appended after the ones already indexed"""
+        offset = self.row_count
+        for search_type, column in SEARCH_COLUMNS.items():
+            if column not in df.columns:
+                continue
+            if offset and search_type not in self._indexed:
+                # Column appeared mid-load; earlier rows can't be matched on it
+                continue
+            self._indexed.add(search_type)
+
+            keys = df[column].astype(str)
+            if search_type == "Patient Name":
+                keys = keys.str.lower()
+
+            key_map = self._maps[search_type]
+            for key, positions in keys.groupby(keys, sort=False).indices.items():
+                positions = positions + offset
+                existing = key_map.get(key)
+                key_map[key] = positions if existing is None else np.concatenate((existing, positions))
+        self.row_count += len(df)
+
+    def lookup(self, search_type, value):
+        """Return the row positions matching value, or an empty array"""
+        if search_type not in self._indexed:
+            raise KeyError(SEARCH_COLUMNS.get(search_type, search_type))
+        key = normalize_key(search_type, value)
+        return self._maps[search_type].get(key, np.empty(0, dtype=np.intp))
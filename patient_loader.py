@@ -0,0 +1,203 @@
+import os
+from concurrent.futures import CancelledError
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import CategoricalDtype, is_float_dtype, is_integer_dtype
+
+from patient_index import PatientIndex
+from vitals_cache import load_cached, save_cache
+from vitals_store import CSV_TIMESTAMP_FORMAT
+
+# Rows parsed per chunk; bounds the parser's working memory regardless of file size
+CHUNK_ROWS = 50_000
+
+# Known blood types come first; anything else in the file is kept as an extra category
+BLOOD_TYPES = ["A+", "A-", "B+", "B-", "AB+", "AB-", "O+", "O-"]
+
+# Low-cardinality text columns stored as categoricals
+CATEGORY_COLUMNS = ("Medical Condition",)
+
+# Readings that stay fractional even when a chunk happens to hold only whole numbers
+FLOAT_COLUMNS = ("Temperature (°C)",)
+
+
+def _parse_timestamps(values):
+    """Parse the dataset's day-first timestamps, falling back to ISO 8601 per value"""
+    parsed = pd.to_datetime(values, format=CSV_TIMESTAMP_FORMAT, errors="coerce")
+    retry = parsed.isna() & values.notna()
+    if retry.any():
+        parsed[retry] = pd.to_datetime(values[retry], format="ISO8601", errors="coerce")
+    return parsed
+
+
+def compact_chunk(chunk, problems=None):
+    """Shrink a parsed chunk: categoricals for text codes, datetime64 timestamps,
+    and the smallest numeric dtype that holds each column (e.g. uint8 heart rate,
+    float32 temperature).
+
+    Values that can't be converted (timestamps in no known format) become
+    NaT; pass a dict as problems to get a per-column count of them.
+    """
+    chunk = chunk.copy()
+    for column in chunk.columns:
+        values = chunk[column]
+        if column == "Blood Type":
+            extra = sorted(set(values.dropna().astype(str)) - set(BLOOD_TYPES))
+            chunk[column] = values.astype(CategoricalDtype(BLOOD_TYPES + extra))
+        elif column in CATEGORY_COLUMNS:
+            chunk[column] = values.astype("category")
+        elif column == "Timestamp":
+            chunk[column] = _parse_timestamps(values)
+            lost = int((chunk[column].isna() & values.notna()).sum())
+            if lost and problems is not None:
+                problems[column] = problems.get(column, 0) + lost
+        elif column in FLOAT_COLUMNS:
+            chunk[column] = values.astype(np.float32)
+        elif is_integer_dtype(values):
+            chunk[column] = pd.to_numeric(values, downcast="unsigned" if values.min() >= 0 else "integer")
+        elif is_float_dtype(values):
+            whole = values.dropna()
+            if len(whole) == len(values) and (whole == whole.round()).all():
+                # Integer readings that only parsed as float; keep them integral
+                chunk[column] = pd.to_numeric(values.astype(np.int64), downcast="unsigned" if whole.min() >= 0 else "integer")
+            else:
+                chunk[column] = values.astype(np.float32)
+    return chunk
+
+
+def _align_categories(frames):
+    """Give every frame's categorical columns the same categories so concat keeps them categorical"""
+    if len(frames) < 2:
+        return frames
+    shared = {}
+    for column in frames[0].columns:
+        if all(isinstance(frame[column].dtype, CategoricalDtype) for frame in frames if column in frame):
+            categories = pd.Index([])
+            for frame in frames:
+                categories = categories.union(frame[column].cat.categories)
+            shared[column] = categories
+    if not shared:
+        return frames
+    aligned = []
+    for frame in frames:
+        frame = frame.copy(deep=False)
+        for column, categories in shared.items():
+            frame[column] = frame[column].cat.set_categories(categories)
+        aligned.append(frame)
+    return aligned
+
+
+def memory_footprint(frames):
+    """Total bytes held by a list of DataFrames, including string/category payloads"""
+    return int(sum(frame.memory_usage(deep=True).sum() for frame in frames))
+
+
+class PatientStore:
+    """Loaded patient rows, kept as the list of parsed chunks.
+
+    Rows are addressed by global position (the same positions PatientIndex
+    hands out), so the chunks never have to be concatenated into one big
+    DataFrame just to answer a lookup.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self._starts = []
+        self.row_count = 0
+        # Column -> count of values compact_chunk() couldn't convert
+        self.problems = {}
+
+    def __len__(self):
+        return self.row_count
+
+    @property
+    def empty(self):
+        return self.row_count == 0
+
+    def append(self, chunk):
+        self.chunks.append(chunk.reset_index(drop=True))
+        self._starts.append(self.row_count)
+        self.row_count += len(chunk)
+
+    def take(self, positions):
+        """Return the rows at the given (ascending) global positions"""
+        positions = np.asarray(positions, dtype=np.intp)
+        if not len(positions) or not self.chunks:
+            columns = self.chunks[0].columns if self.chunks else None
+            return pd.DataFrame(columns=columns)
+
+        chunk_ids = np.searchsorted(self._starts, positions, side="right") - 1
+        parts = []
+        for chunk_id in np.unique(chunk_ids):
+            local = positions[chunk_ids == chunk_id] - self._starts[chunk_id]
+            parts.append(self.chunks[chunk_id].iloc[local])
+        return parts[0] if len(parts) == 1 else pd.concat(_align_categories(parts), ignore_index=True)
+
+    def frame(self):
+        """Materialize all rows as a single DataFrame"""
+        if not self.chunks:
+            return pd.DataFrame()
+        return pd.concat(_align_categories(self.chunks), ignore_index=True)
+
+    def memory_usage(self):
+        """Bytes held by the stored rows"""
+        return memory_footprint(self.chunks)
+
+
+def iter_csv_chunks(file_path, chunk_rows=CHUNK_ROWS, compact=True):
+    """Yield a CSV's parsed chunks one at a time without keeping them, for single-pass scans"""
+    with open(file_path, "rb") as handle:
+        for chunk in pd.read_csv(handle, chunksize=chunk_rows):
+            yield compact_chunk(chunk) if compact else chunk
+
+
+def stream_csv(file_path, chunk_rows=CHUNK_ROWS, on_progress=None, cancel_event=None, compact=True):
+    """Read a CSV in bounded chunks, indexing and storing each one as it arrives.
+
+    With compact=True each chunk goes through compact_chunk() before it is
+    stored. on_progress(bytes_read, total_bytes) is called after every chunk. Setting
+    cancel_event stops the load between chunks with CancelledError.
+    Returns a (PatientStore, PatientIndex) pair.
+    """
+    store = PatientStore()
+    index = PatientIndex()
+    total_bytes = os.path.getsize(file_path)
+
+    with open(file_path, "rb") as handle:
+        for chunk in pd.read_csv(handle, chunksize=chunk_rows):
+            if cancel_event is not None and cancel_event.is_set():
+                raise CancelledError()
+            if compact:
+                chunk = compact_chunk(chunk, store.problems)
+            index.add_rows(chunk)
+            store.append(chunk)
+            if on_progress:
+                on_progress(min(handle.tell(), total_bytes), total_bytes)
+
+    return store, index
+
+
+def load_patient_file(file_path, on_progress=None, cancel_event=None):
+    """Load a CSV through its binary cache; returns a (PatientStore, PatientIndex) pair.
+
+    A cache hit skips CSV parsing entirely. On a miss the CSV is streamed,
+    then written to the cache so the next load of the same file is fast.
+    """
+    cached = load_cached(file_path)
+    if cached is not None:
+        store = PatientStore()
+        index = PatientIndex()
+        for frame in cached:
+            store.append(frame)
+            index.add_rows(frame)
+        if on_progress:
+            on_progress(1, 1)
+        return store, index
+
+    store, index = stream_csv(file_path, on_progress=on_progress, cancel_event=cancel_event)
+    if not store.empty and not store.problems:
+        # Written chunk by chunk, so the rows are never held twice. Files with
+        # unconvertible values skip the cache, so every load reports them.
+        save_cache(file_path, _align_categories(store.chunks))
+    return store, index
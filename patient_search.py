@@ -0,0 +1,74 @@
+import re
+import sqlite3
+
+# Upper bound on rows returned by one search
+SEARCH_LIMIT = 500
+
+SEARCH_FIELDS = ("name", "condition", "health_problem", "medications", "diet_plan")
+
+
+def ensure_search_index(conn):
+    """Create the FTS5 index over patients and the triggers that keep it in sync.
+
+    Returns False when this SQLite build has no FTS5, in which case callers
+    should fall back to LIKE matching. The caller commits.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'patients_fts'").fetchone()
+    if exists:
+        return True
+
+    fields = ", ".join(SEARCH_FIELDS)
+    new_fields = ", ".join(f"new.{field}" for field in SEARCH_FIELDS)
+    old_fields = ", ".join(f"old.{field}" for field in SEARCH_FIELDS)
+    try:
+        conn.execute(f"""CREATE VIRTUAL TABLE patients_fts USING fts5(
+                            {fields}, content='patients', content_rowid='id', tokenize='unicode61')""")
+    except sqlite3.OperationalError:
+        return False
+
+    conn.execute(f"""CREATE TRIGGER IF NOT EXISTS patients_fts_ai AFTER INSERT ON patients BEGIN
+                        INSERT INTO patients_fts(rowid, {fields}) VALUES (new.id, {new_fields});
+                     END""")
+    conn.execute(f"""CREATE TRIGGER IF NOT EXISTS patients_fts_ad AFTER DELETE ON patients BEGIN
+                        INSERT INTO patients_fts(patients_fts, rowid, {fields}) VALUES ('delete', old.id, {old_fields});
+                     END""")
+    create_update_trigger(conn)
+    # Index the rows that existed before the index did
+    conn.execute("INSERT INTO patients_fts(patients_fts) VALUES ('rebuild')")
+    return True
+
+
+def create_update_trigger(conn):
+    """(Re)create the trigger re-indexing a patient when one of SEARCH_FIELDS changes.
+
+    Scoped with UPDATE OF, so vitals updates to heart_rate/temperature don't
+    re-index the text fields. No-op without the FTS index. The caller commits.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'patients_fts'").fetchone()
+    if not exists:
+        return
+    fields = ", ".join(SEARCH_FIELDS)
+    new_fields = ", ".join(f"new.{field}" for field in SEARCH_FIELDS)
+    old_fields = ", ".join(f"old.{field}" for field in SEARCH_FIELDS)
+    conn.execute("DROP TRIGGER IF EXISTS patients_fts_au")
+    conn.execute(f"""CREATE TRIGGER patients_fts_au AFTER UPDATE OF {fields} ON patients BEGIN
+                        INSERT INTO patients_fts(patients_fts, rowid, {fields}) VALUES ('delete', old.id, {old_fields});
+                        INSERT INTO patients_fts(rowid, {fields}) VALUES (new.id, {new_fields});
+                     END""")
+
+
+def build_match_query(search_term):
+    """Turn free text into an FTS5 query: every word must match as a prefix"""
+    words = re.findall(r"\w+", search_term)
+    return " ".join('"{}"*'.format(word.replace('"', '""')) for word in words)
+
+
+def search_patients(conn, select_sql, search_term, limit=SEARCH_LIMIT):
+    """Ranked prefix search over the indexed fields; select_sql must select FROM patients"""
+    match_query = build_match_query(search_term)
+    if not match_query:
+        return []
+    return conn.execute(select_sql + """
+        JOIN (SELECT rowid AS patient_id, rank FROM patients_fts WHERE patients_fts MATCH ? ORDER BY rank LIMIT ?) AS hits
+          ON patients.id = hits.patient_id
+        ORDER BY hits.rank""", (match_query, limit)).fetchall()
@@ -0,0 +1,161 @@
+import sys
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+from metrics import current_action, observe, timed_call
+
+# How often the Tk thread checks for finished background work
+POLL_MS = 50
+
+
+class Task:
+    """Handle for a piece of work submitted to a TaskRunner"""
+
+    def __init__(self, on_done=None, on_error=None, on_progress=None):
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_progress = on_progress
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.progress = None
+        self.action = None
+        self.started = None
+        self._reported = None
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    def cancel(self):
+        self.cancel_event.set()
+        if self.future is not None:
+            self.future.cancel()
+
+    def set_progress(self, value):
+        """Record progress from the worker; delivered to on_progress on the Tk thread"""
+        self.progress = value
+
+
+class TaskRunner:
+    """Runs blocking work on a thread pool and hands results back to the Tk mainloop.
+
+    Workers never touch Tk: callbacks (on_done, on_error, on_progress) are
+    dispatched from a root.after() poll on the Tk thread. on_busy(True/False)
+    is called when the first task starts and the last one finishes. Task
+    run times and named on_done/on_error callbacks are recorded in metrics,
+    and tasks started from a @timed callback record the time from submit
+    until their callback has run under that callback's name.
+    """
+
+    def __init__(self, root, max_workers=4, on_busy=None):
+        self.root = root
+        self.on_busy = on_busy
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="phms-worker")
+        self.tasks = []
+        self._busy = False
+        self._polling = False
+
+    @property
+    def busy(self):
+        return self._busy
+
+    def submit(self, fn, *args, on_done=None, on_error=None, on_progress=None, cancellable=False,
+               action=None, since=None):
+        """Run fn(*args) in the pool; with cancellable=True it's called as fn(task, *args).
+
+        action and since (a perf_counter() time) override the current
+        timed callback and the submit time for phms_action_seconds, for
+        work that was requested earlier than it could be started.
+        """
+        task = Task(on_done, on_error, on_progress)
+        task.action, task.started = action, since
+        name = getattr(fn, "__name__", "task")
+        if cancellable:
+            task.future = self.executor.submit(timed_call, "phms_task_seconds", name, fn, task, *args)
+        else:
+            task.future = self.executor.submit(timed_call, "phms_task_seconds", name, fn, *args)
+        return self.watch(task)
+
+    def watch(self, task):
+        """Track a task whose future was created elsewhere (e.g. another executor)"""
+        if task.action is None:
+            task.action = current_action()
+        if task.started is None:
+            task.started = time.perf_counter()
+        self.tasks.append(task)
+        if not self._busy:
+            self._busy = True
+            if self.on_busy:
+                self.on_busy(True)
+        if not self._polling:
+            self._polling = True
+            self.root.after(POLL_MS, self._poll)
+        return task
+
+    def cancel_all(self):
+        for task in self.tasks:
+            task.cancel()
+
+    def shutdown(self):
+        self.cancel_all()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+    def _poll(self):
+        try:
+            current, self.tasks = self.tasks, []
+            finished = []
+            for task in current:
+                if task.on_progress and task.progress != task._reported:
+                    task._reported = task.progress
+                    self._guarded(task.on_progress, task.progress)
+                if task.future.done():
+                    finished.append(task)
+                else:
+                    self.tasks.append(task)
+
+            # Callbacks may submit follow-up work, which lands back in self.tasks
+            for task in finished:
+                self._guarded(self._finish, task)
+        finally:
+            # Always reschedule or go idle, so one failing callback can't stall every later task
+            if self.tasks:
+                self.root.after(POLL_MS, self._poll)
+            else:
+                self._polling = False
+                self._busy = False
+                if self.on_busy:
+                    self._guarded(self.on_busy, False)
+
+    def _guarded(self, callback, value):
+        """Run a callback, reporting any exception the way Tk reports callback errors"""
+        try:
+            callback(value)
+        except Exception:
+            self.root.report_callback_exception(*sys.exc_info())
+
+    def _finish(self, task):
+        if task.cancelled or task.future.cancelled():
+            return
+        try:
+            result = task.future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            if task.on_error:
+                self._callback(task.on_error, e)
+        else:
+            if task.on_done:
+                self._callback(task.on_done, result)
+        finally:
+            if task.action and not task.future.cancelled():
+                observe("phms_action_seconds", task.action, time.perf_counter() - task.started)
+
+    @staticmethod
+    def _callback(callback, value):
+        name = getattr(callback, "__name__", "<lambda>")
+        if name == "<lambda>":
+            # Anonymous callbacks would all share one label; not worth timing
+            callback(value)
+        else:
+            timed_call("phms_callback_seconds", name, callback, value)
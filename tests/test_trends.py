@@ -0,0 +1,58 @@
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from trends import scan_trends, trend_summary  # noqa: E402
+
+COLUMN = "Heart_Rate (bpm)"
+
+
+def _readings(seed=0):
+    """Per-second readings for three patients with known slopes, in present-day epoch days"""
+    rng = np.random.default_rng(seed)
+    frames = []
+    for patient_id, slope, count in ((1, 800.0, 60), (2, -50.0, 500), (3, 0.5, 3)):
+        seconds = np.sort(rng.choice(86_400, size=count, replace=False))
+        stamps = pd.Timestamp("2024-01-01") + pd.to_timedelta(seconds, unit="s")
+        days = seconds / 86_400
+        frames.append(pd.DataFrame({
+            "Patient_ID": patient_id,
+            "Timestamp": stamps,
+            COLUMN: 70 + slope * days + rng.normal(0, 2, count),
+        }))
+    return pd.concat(frames, ignore_index=True).sample(frac=1, random_state=seed)
+
+
+def _expected(df):
+    expected = {}
+    for patient_id, rows in df.groupby("Patient_ID"):
+        days = (rows["Timestamp"] - pd.Timestamp("1970-01-01")) / pd.Timedelta(days=1)
+        y = rows[COLUMN].to_numpy()
+        expected[patient_id] = (np.polyfit(days.to_numpy(), y, 1)[0], np.var(y, ddof=1), y.mean())
+    return expected
+
+
+def _check(summary, df):
+    for patient_id, (slope, variance, mean) in _expected(df).items():
+        row = summary.loc[patient_id]
+        assert row[(COLUMN, "slope")] == pytest.approx(slope, rel=1e-6)
+        assert row[(COLUMN, "var")] == pytest.approx(variance, rel=1e-9)
+        assert row[(COLUMN, "mean")] == pytest.approx(mean, rel=1e-12)
+        assert row[(COLUMN, "count")] == (df["Patient_ID"] == patient_id).sum()
+
+
+def test_trend_summary_matches_polyfit_and_var():
+    df = _readings()
+    _check(trend_summary(df), df)
+
+
+def test_scan_trends_combines_chunks_like_one_block():
+    df = _readings(seed=1)
+    chunks = [df.iloc[start:start + 37] for start in range(0, len(df), 37)]
+    _check(scan_trends(SimpleNamespace(chunks=chunks)), df)
@@ -0,0 +1,190 @@
+import functools
+
+import numpy as np
+import pandas as pd
+
+# Readings analysed for trends, and the label used when displaying each
+TREND_COLUMNS = {
+    "Temperature (°C)": "Temperature",
+    "Systolic_BP (mmHg)": "Systolic BP",
+    "Diastolic_BP (mmHg)": "Diastolic BP",
+    "Heart_Rate (bpm)": "Heart rate",
+}
+
+# Readings per rolling window
+ROLLING_WINDOW = 5
+
+SUMMARY_STATS = ("count", "mean", "min", "max", "var", "slope")
+
+# Moments kept per patient and column: count, means, and centered sums of squares/products.
+# Enough to combine chunks and derive every summary stat without cancellation.
+_MOMENTS = ("n", "mx", "my", "mxx", "mxy", "myy")
+
+_NS_PER_DAY = 86_400 * 10 ** 9
+
+
+def _trend_columns(df):
+    return [column for column in TREND_COLUMNS if column in df.columns]
+
+
+def _readings(df, column):
+    # NaN for missing/blank readings
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=np.float64)
+
+
+def _days(df):
+    """Timestamps as fractional days since the Unix epoch (NaN where missing)"""
+    stamps = pd.to_datetime(df["Timestamp"], errors="coerce").to_numpy("datetime64[ns]")
+    days = stamps.view(np.int64) / _NS_PER_DAY
+    days[np.isnat(stamps)] = np.nan
+    return days
+
+
+def _window_stats(y, first, window):
+    """Trailing-window mean/min/max/variance of y, where first[i] is the first row of row i's patient.
+
+    Sums come from differences of cumulative sums, min/max from a strided
+    (window x rows) view, so the cost is a few array passes whatever the
+    number of patients. Missing readings are skipped, as pandas rolling does.
+    """
+    rows = len(y)
+    start = np.maximum(np.arange(rows) - window + 1, first)
+    valid = ~np.isnan(y)
+    clean = np.where(valid, y, 0.0)
+    count = np.concatenate(([0], np.cumsum(valid)))
+    total = np.concatenate(([0.0], np.cumsum(clean)))
+    squares = np.concatenate(([0.0], np.cumsum(clean * clean)))
+    n = count[1:] - count[start]
+    sy = total[1:] - total[start]
+    syy = squares[1:] - squares[start]
+
+    padded = np.concatenate((np.full(window - 1, np.nan), y))
+    windows = np.lib.stride_tricks.sliding_window_view(padded, window)
+    before_start = (np.arange(rows)[:, None] - window + 1 + np.arange(window)) < start[:, None]
+    windows = np.where(before_start, np.nan, windows)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return {
+            "mean": np.where(n > 0, sy / n, np.nan),
+            "min": np.fmin.reduce(windows, axis=1),
+            "max": np.fmax.reduce(windows, axis=1),
+            "var": np.where(n > 1, np.maximum(syy - sy * sy / n, 0) / (n - 1), np.nan),
+        }
+
+
+def rolling_trends(df, window=ROLLING_WINDOW):
+    """Rolling mean/min/max/variance over each patient's last `window` readings.
+
+    Rows are ordered by patient and time, then every patient's windows are
+    computed together in one vectorized pass. Columns are (reading, stat) pairs.
+    """
+    ordered = df.sort_values(["Patient_ID", "Timestamp"], kind="stable")
+    patients = ordered["Patient_ID"].to_numpy()
+    new_patient = np.ones(len(patients), dtype=bool)
+    new_patient[1:] = patients[1:] != patients[:-1]
+    first = np.maximum.accumulate(np.where(new_patient, np.arange(len(patients)), 0))
+
+    result = {("Patient_ID", ""): patients, ("Timestamp", ""): ordered["Timestamp"].to_numpy()}
+    for column in _trend_columns(df):
+        for stat, values in _window_stats(_readings(ordered, column), first, window).items():
+            result[(column, stat)] = values
+    return pd.DataFrame(result)
+
+
+def _partial_sums(df):
+    """Per-patient moments for one block of readings, as a (column, moment) frame.
+
+    Each block keeps its count, means and centered sums of squares/products
+    (two passes: means first, then deviations from them), so no sum of raw
+    epoch-day values is ever subtracted from another. Sums are np.bincount
+    over factorized patient codes and min/max are reduceat over the rows
+    grouped by patient, avoiding pandas groupby overhead.
+    """
+    codes, patients = pd.factorize(df["Patient_ID"], sort=True)
+    known = codes >= 0
+    codes = codes[known]
+    groups = len(patients)
+    order = np.argsort(codes, kind="stable")
+    starts = np.flatnonzero(np.diff(codes[order], prepend=-1))
+    days = _days(df)[known]
+
+    parts = {}
+    for column in _trend_columns(df):
+        y = _readings(df, column)[known]
+        valid = ~(np.isnan(y) | np.isnan(days))
+        n = np.bincount(codes, weights=valid, minlength=groups)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mx = np.where(n > 0, np.bincount(codes, weights=np.where(valid, days, 0.0), minlength=groups) / n, 0.0)
+            my = np.where(n > 0, np.bincount(codes, weights=np.where(valid, y, 0.0), minlength=groups) / n, 0.0)
+        dx = np.where(valid, days - mx[codes], 0.0)
+        dy = np.where(valid, y - my[codes], 0.0)
+        for name, values in (("n", n), ("mx", mx), ("my", my)):
+            parts[(column, name)] = values
+        for name, weights in (("mxx", dx * dx), ("mxy", dx * dy), ("myy", dy * dy)):
+            parts[(column, name)] = np.bincount(codes, weights=weights, minlength=groups)
+        grouped = np.where(valid, y, np.nan)[order]
+        parts[(column, "min")] = np.fmin.reduceat(grouped, starts) if len(grouped) else np.empty(0)
+        parts[(column, "max")] = np.fmax.reduceat(grouped, starts) if len(grouped) else np.empty(0)
+    return pd.DataFrame(parts, index=pd.Index(patients, name="Patient_ID"))
+
+
+def _merge_moments(a, b):
+    """Combine two blocks' moments per patient (Chan et al.'s pairwise update)"""
+    index = a.index.union(b.index)
+    a, b = a.reindex(index), b.reindex(index)
+    merged = {}
+    for column in dict.fromkeys(key[0] for key in a.columns):
+        # Patients missing from one block come back as NaN rows; they count as empty
+        first = {name: np.nan_to_num(a[(column, name)].to_numpy()) for name in _MOMENTS}
+        second = {name: np.nan_to_num(b[(column, name)].to_numpy()) for name in _MOMENTS}
+        n = first["n"] + second["n"]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(n > 0, second["n"] / n, 0.0)
+            cross = np.where(n > 0, first["n"] * second["n"] / n, 0.0)
+        dx = second["mx"] - first["mx"]
+        dy = second["my"] - first["my"]
+        merged[(column, "n")] = n
+        merged[(column, "mx")] = first["mx"] + dx * weight
+        merged[(column, "my")] = first["my"] + dy * weight
+        merged[(column, "mxx")] = first["mxx"] + second["mxx"] + dx * dx * cross
+        merged[(column, "mxy")] = first["mxy"] + second["mxy"] + dx * dy * cross
+        merged[(column, "myy")] = first["myy"] + second["myy"] + dy * dy * cross
+        merged[(column, "min")] = np.fmin(a[(column, "min")].to_numpy(), b[(column, "min")].to_numpy())
+        merged[(column, "max")] = np.fmax(a[(column, "max")].to_numpy(), b[(column, "max")].to_numpy())
+    return pd.DataFrame(merged, index=index)
+
+
+def summarize_trends(partials):
+    """Combine per-block moments into one row of stats per patient.
+
+    Slope is the least-squares trend in units per day, Cxy / Sxx over the
+    centered moments, so no per-patient regression is run.
+    """
+    partials = [part for part in partials if len(part.columns)]
+    if not partials:
+        return pd.DataFrame(columns=pd.MultiIndex.from_product([[], SUMMARY_STATS]))
+    totals = functools.reduce(_merge_moments, partials)
+
+    result = {}
+    for column in dict.fromkeys(key[0] for key in partials[0].columns):
+        n, mx, my, mxx, mxy, myy = (totals[(column, name)].to_numpy() for name in _MOMENTS)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result[(column, "count")] = n.astype(np.int64)
+            result[(column, "mean")] = np.where(n > 0, my, np.nan)
+            result[(column, "min")] = totals[(column, "min")].to_numpy()
+            result[(column, "max")] = totals[(column, "max")].to_numpy()
+            result[(column, "var")] = np.where(n > 1, myy / (n - 1), np.nan)
+            result[(column, "slope")] = np.where(mxx > 0, mxy / mxx, np.nan)
+    summary = pd.DataFrame(result, index=totals.index)
+    summary.index.name = "Patient_ID"
+    return summary
+
+
+def trend_summary(df):
+    """Per-patient trend stats for one DataFrame of readings"""
+    return summarize_trends([_partial_sums(df)])
+
+
+def scan_trends(store):
+    """Per-patient trend stats over a whole PatientStore, one chunk at a time"""
+    return summarize_trends(_partial_sums(chunk) for chunk in store.chunks)
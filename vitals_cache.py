@@ -0,0 +1,120 @@
+import hashlib
+import os
+import pickle
+import re
+
+import pandas as pd
+
+try:
+    import pyarrow
+    from pyarrow import feather, ipc
+    CACHE_FORMAT = "feather"
+    _FORMAT_ERRORS = (pyarrow.ArrowException,)
+except ImportError:
+    feather = None
+    CACHE_FORMAT = "pkl"
+    _FORMAT_ERRORS = ()
+
+# Raised when a frame can't be serialized (e.g. an object column mixing numbers and text)
+_WRITE_ERRORS = (OSError, ValueError, TypeError, AttributeError, pickle.PicklingError) + _FORMAT_ERRORS
+
+# Sidecar directory created next to the source CSV
+CACHE_DIR = ".vitals_cache"
+
+# Part of every cache key; bump it whenever what gets cached changes (e.g.
+# compact_chunk() dtypes or the mmap column layout), so older sidecars are rebuilt
+CACHE_VERSION = 3
+
+
+def cache_key(file_path):
+    """Identify a version of the source file by path, size and modification time, and the cache format"""
+    stat = os.stat(file_path)
+    source = f"{os.path.abspath(file_path)}|{stat.st_size}|{stat.st_mtime_ns}|{CACHE_VERSION}"
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:16]
+
+
+def _cache_prefix(file_path):
+    directory = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR)
+    return os.path.join(directory, os.path.basename(file_path))
+
+
+def cache_path(file_path):
+    return f"{_cache_prefix(file_path)}.{cache_key(file_path)}.{CACHE_FORMAT}"
+
+
+def stale_versions(file_path, suffix):
+    """Paths of sidecars built from other versions of exactly file_path.
+
+    Names must be {basename}.{key}.{suffix}, so "a.csv" never matches the
+    sidecars of "a.csv.bak.csv".
+    """
+    prefix = _cache_prefix(file_path)
+    directory, basename = os.path.split(prefix)
+    if not os.path.isdir(directory):
+        return []
+    current = f"{basename}.{cache_key(file_path)}.{suffix}"
+    pattern = re.compile(rf"{re.escape(basename)}\.[0-9a-f]{{16}}\.{re.escape(suffix)}")
+    return [os.path.join(directory, name) for name in os.listdir(directory)
+            if name != current and pattern.fullmatch(name)]
+
+
+def load_cached(file_path):
+    """Return the cached DataFrames for file_path, or None if there is no cache for this version.
+
+    Feather caches are memory-mapped, so columns are read without copying,
+    and come back as one frame; pickle caches keep the saved chunks.
+    """
+    path = cache_path(file_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        if feather is not None:
+            return [feather.read_feather(path, memory_map=True)]
+        return pd.read_pickle(path)
+    except (OSError, ValueError, EOFError, pickle.UnpicklingError, AttributeError, ImportError) + _FORMAT_ERRORS:
+        # Corrupt or written by an incompatible version; fall back to the CSV
+        return None
+
+
+def _write_feather(frames, path):
+    """Write frames to one uncompressed Feather file, converting one frame at a time.
+
+    Column types are unified first (chunks may have narrowed the same column
+    to different widths), so the frames never have to be concatenated.
+    Categorical columns must already share their categories across frames.
+    """
+    schema = pyarrow.unify_schemas([pyarrow.Schema.from_pandas(frame, preserve_index=False) for frame in frames],
+                                   promote_options="permissive")
+    with pyarrow.OSFile(path, "wb") as sink, ipc.new_file(sink, schema) as writer:
+        for frame in frames:
+            writer.write_table(pyarrow.Table.from_pandas(frame, schema=schema, preserve_index=False))
+
+
+def save_cache(file_path, frames):
+    """Write a list of DataFrames (one file's chunks, in order) as the cache for the
+    current version of file_path and drop stale versions.
+
+    Caching is best-effort: returns False if the sidecar can't be written.
+    """
+    path = cache_path(file_path)
+    temp_path = path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if CACHE_FORMAT == "feather":
+            _write_feather(frames, temp_path)
+        else:
+            pd.to_pickle(list(frames), temp_path)
+        os.replace(temp_path, path)
+    except _WRITE_ERRORS:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        return False
+
+    for stale in stale_versions(file_path, CACHE_FORMAT):
+        try:
+            os.remove(stale)
+        except OSError:
+            pass
+    return True
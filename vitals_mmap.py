@@ -0,0 +1,328 @@
+import json
+import os
+import shutil
+from concurrent.futures import CancelledError
+
+import numpy as np
+import pandas as pd
+
+from vitals_cache import CACHE_DIR, cache_key, stale_versions
+from vitals_store import CSV_TIMESTAMP_FORMAT
+
+# Rows parsed per chunk while building, and rows per chunk when scanning the store
+MMAP_CHUNK_ROWS = 200_000
+
+# CSVs at least this large are opened memory-mapped by the GUI
+MMAP_MIN_BYTES = 256 * 1024 ** 2
+
+# Column the offset index is keyed on, and the search type it answers
+KEY_COLUMN = "Patient_ID"
+KEY_SEARCH_TYPE = "Patient ID"
+
+TEXT_COLUMNS = ("Blood Type", "Medical Condition")
+FLOAT_COLUMNS = ("Temperature (°C)",)
+
+# Largest whole number float32 holds exactly
+FLOAT32_EXACT = 2 ** 24
+
+META_FILE = "meta.json"
+INDEX_FILE = "index.npz"
+
+
+def mmap_dir(file_path):
+    """Directory holding the column files for the current version of file_path"""
+    directory = os.path.join(os.path.dirname(os.path.abspath(file_path)), CACHE_DIR)
+    return os.path.join(directory, f"{os.path.basename(file_path)}.{cache_key(file_path)}.mmap")
+
+
+def _column_file(directory, number):
+    return os.path.join(directory, f"col{number}.npy")
+
+
+def _number_text(values):
+    """Render numbers as they appear in the CSV, so 3.0 and a later "3" share one category"""
+    return values.map(lambda value: None if pd.isna(value)
+                      else str(int(value)) if float(value).is_integer() else repr(float(value)))
+
+
+class _ColumnWriter:
+    """Appends one column's values, chunk by chunk, to a raw wide-typed file.
+
+    Tracks what the final narrow dtype needs to be: text becomes int32
+    category codes (-1 for blanks), timestamps int64 nanoseconds, everything
+    else float64 until the range and integrality of the whole column is known.
+    """
+
+    def __init__(self, path, column):
+        self.path = path
+        self.column = column
+        self.handle = open(path, "wb")
+        self.kind = "text" if column in TEXT_COLUMNS else "time" if column == "Timestamp" else None
+        self.categories = {}
+        self.minimum = np.inf
+        self.maximum = -np.inf
+        self.whole = column not in FLOAT_COLUMNS
+        self.missing = False
+
+    def write(self, values):
+        if self.kind is None and not pd.api.types.is_numeric_dtype(values):
+            # Free text in a column we expected to be numeric; store it as categories
+            self._to_text()
+        if self.kind == "text":
+            if pd.api.types.is_numeric_dtype(values):
+                values = _number_text(values)
+            raw = self._codes(values)
+        elif self.kind == "time":
+            raw = pd.to_datetime(values, format=CSV_TIMESTAMP_FORMAT, errors="coerce").to_numpy("datetime64[ns]").view(np.int64)
+        else:
+            raw = values.to_numpy(dtype=np.float64, na_value=np.nan)
+            present = raw[~np.isnan(raw)]
+            self.missing = self.missing or len(present) < len(raw)
+            if len(present):
+                self.minimum = min(self.minimum, present.min())
+                self.maximum = max(self.maximum, present.max())
+                self.whole = self.whole and bool((present == np.round(present)).all())
+        raw.tofile(self.handle)
+
+    def _codes(self, values):
+        codes, uniques = pd.factorize(values)
+        mapping = np.array([self.categories.setdefault(value, len(self.categories)) for value in uniques] + [-1],
+                           dtype=np.int32)
+        return mapping[codes]  # code -1 indexes the trailing -1
+
+    def _to_text(self):
+        """Switch a numeric column to categories, re-encoding the float64 values already written"""
+        self.handle.close()
+        self.kind = "text"
+        written = os.path.getsize(self.path) // np.dtype(np.float64).itemsize
+        with open(self.path + ".text", "wb") as encoded:
+            if written:
+                numbers = np.memmap(self.path, dtype=np.float64, mode="r", shape=(written,))
+                for start in range(0, written, MMAP_CHUNK_ROWS):
+                    self._codes(_number_text(pd.Series(numbers[start:start + MMAP_CHUNK_ROWS]))).tofile(encoded)
+                del numbers
+        os.replace(self.path + ".text", self.path)
+        self.handle = open(self.path, "ab")
+
+    def close(self):
+        self.handle.close()
+
+    @property
+    def raw_dtype(self):
+        return np.int32 if self.kind == "text" else np.int64 if self.kind == "time" else np.float64
+
+    @property
+    def dtype(self):
+        """Narrowest fixed-width dtype holding every value of the column"""
+        if self.kind == "text":
+            return np.min_scalar_type(-max(len(self.categories), 1))
+        if self.kind == "time":
+            return np.int64
+        if self.missing or not self.whole or self.minimum > self.maximum:
+            # Blanks need NaN; keys and large whole numbers must not be rounded into each other
+            if self.column == KEY_COLUMN or (self.whole and max(-self.minimum, self.maximum) > FLOAT32_EXACT):
+                return np.float64
+            return np.float32
+        if self.minimum >= 0:
+            return np.min_scalar_type(int(self.maximum))
+        return np.result_type(np.min_scalar_type(int(self.minimum)), np.min_scalar_type(-int(self.maximum) - 1))
+
+    def meta(self):
+        entry = {"name": self.column, "kind": self.kind or "number", "dtype": np.dtype(self.dtype).str}
+        if self.kind == "text":
+            entry["categories"] = list(self.categories)
+        return entry
+
+
+def build_mmap_store(file_path, on_progress=None, cancel_event=None, chunk_rows=MMAP_CHUNK_ROWS):
+    """Convert a vitals CSV into sorted fixed-width column files; returns the directory.
+
+    Pass one streams the CSV into raw per-column files. Pass two orders rows
+    by Patient_ID and rewrites each column, one at a time, in its narrowest
+    dtype, so only the sort order is ever held in memory whole. Finally an
+    offset index (patient id -> first row, row count) is saved beside them.
+    on_progress(done, total) and cancel_event behave as in stream_csv().
+    """
+    target = mmap_dir(file_path)
+    building = target + ".tmp"
+    shutil.rmtree(building, ignore_errors=True)
+    os.makedirs(building)
+    total_bytes = os.path.getsize(file_path)
+
+    try:
+        writers = None
+        rows = 0
+        with open(file_path, "rb") as handle:
+            for chunk in pd.read_csv(handle, chunksize=chunk_rows):
+                if cancel_event is not None and cancel_event.is_set():
+                    raise CancelledError()
+                if writers is None:
+                    writers = [_ColumnWriter(_column_file(building, number) + ".raw", column)
+                               for number, column in enumerate(chunk.columns)]
+                for writer in writers:
+                    writer.write(chunk[writer.column])
+                rows += len(chunk)
+                if on_progress:
+                    # Parsing is roughly the first 80% of the work
+                    on_progress(0.8 * min(handle.tell(), total_bytes), total_bytes)
+        if writers is None or KEY_COLUMN not in [writer.column for writer in writers]:
+            raise ValueError(f"CSV has no {KEY_COLUMN} column")
+        for writer in writers:
+            writer.close()
+
+        key_number = [writer.column for writer in writers].index(KEY_COLUMN)
+        key_raw = np.memmap(writers[key_number].path, dtype=writers[key_number].raw_dtype, mode="r", shape=(rows,))
+        order = np.argsort(key_raw, kind="stable")
+        del key_raw
+
+        for number, writer in enumerate(writers):
+            if cancel_event is not None and cancel_event.is_set():
+                raise CancelledError()
+            source = np.memmap(writer.path, dtype=writer.raw_dtype, mode="r", shape=(rows,))
+            column = np.lib.format.open_memmap(_column_file(building, number), mode="w+", dtype=writer.dtype, shape=(rows,))
+            for start in range(0, rows, chunk_rows):
+                column[start:start + chunk_rows] = source[order[start:start + chunk_rows]]
+            column.flush()
+            del source, column
+            os.remove(writer.path)
+            if on_progress:
+                on_progress(total_bytes * (0.8 + 0.2 * (number + 1) / len(writers)), total_bytes)
+        del order
+
+        keys = np.load(_column_file(building, key_number), mmap_mode="r")
+        ids, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+        del keys
+        np.savez(os.path.join(building, INDEX_FILE), ids=ids, starts=starts, counts=counts)
+        with open(os.path.join(building, META_FILE), "w", encoding="utf-8") as meta:
+            json.dump({"rows": rows, "key": key_number, "columns": [writer.meta() for writer in writers]}, meta)
+    except BaseException:
+        if writers:
+            for writer in writers:
+                writer.close()
+        shutil.rmtree(building, ignore_errors=True)
+        raise
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(building, target)
+    return target
+
+
+class MmapIndex:
+    """Offset index over a Patient_ID-sorted store: each id's rows are one contiguous range.
+
+    Offers the same lookup() as PatientIndex; only the per-patient arrays
+    are held in memory, never the rows themselves.
+    """
+
+    def __init__(self, ids, starts, counts, categories=None):
+        self.ids = ids
+        self.starts = starts
+        self.counts = counts
+        self.categories = categories
+
+    def _key(self, value):
+        value = str(value).strip()
+        if self.categories is not None:
+            return self.categories.get(value)
+        try:
+            return float(value)
+        except ValueError:
+            return None
+
+    def lookup(self, search_type, value):
+        """Return the row positions matching value, or an empty array"""
+        if search_type != KEY_SEARCH_TYPE:
+            raise KeyError(search_type)
+        key = self._key(value)
+        if key is None:
+            return np.empty(0, dtype=np.intp)
+        slot = np.searchsorted(self.ids, key)
+        if slot == len(self.ids) or self.ids[slot] != key:
+            return np.empty(0, dtype=np.intp)
+        start = int(self.starts[slot])
+        return np.arange(start, start + int(self.counts[slot]), dtype=np.intp)
+
+
+class MmapPatientStore:
+    """Read-only vitals rows backed by memory-mapped column files.
+
+    Has the PatientStore interface used by the GUI and the alert scan, but
+    take() only faults in the pages holding the requested rows and chunks
+    are produced lazily, so resident memory stays flat however big the file is.
+    """
+
+    def __init__(self, directory, chunk_rows=MMAP_CHUNK_ROWS):
+        self.directory = directory
+        self.chunk_rows = chunk_rows
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as meta:
+            meta = json.load(meta)
+        self.row_count = meta["rows"]
+        self.columns = meta["columns"]
+        self._arrays = [np.load(_column_file(directory, number), mmap_mode="r") for number in range(len(self.columns))]
+        self._categories = [pd.Index(column["categories"]) if column["kind"] == "text" else None
+                            for column in self.columns]
+
+        with np.load(os.path.join(directory, INDEX_FILE)) as index:
+            key = self.columns[meta["key"]]
+            categories = {name: code for code, name in enumerate(key["categories"])} if key["kind"] == "text" else None
+            self.index = MmapIndex(index["ids"], index["starts"], index["counts"], categories)
+
+    def __len__(self):
+        return self.row_count
+
+    @property
+    def empty(self):
+        return self.row_count == 0
+
+    def _frame(self, selector):
+        data = {}
+        for column, array, categories in zip(self.columns, self._arrays, self._categories):
+            values = np.asarray(array[selector])
+            if categories is not None:
+                data[column["name"]] = pd.Categorical.from_codes(values.astype(np.int32), categories=categories)
+            elif column["kind"] == "time":
+                data[column["name"]] = values.view("datetime64[ns]")
+            else:
+                data[column["name"]] = values
+        return pd.DataFrame(data)
+
+    def take(self, positions):
+        """Return the rows at the given (ascending) positions"""
+        positions = np.asarray(positions, dtype=np.intp)
+        if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+            # One patient's rows are contiguous; a slice reads them without a gather
+            return self._frame(slice(positions[0], positions[-1] + 1))
+        return self._frame(positions)
+
+    @property
+    def chunks(self):
+        """Consecutive row blocks as DataFrames, materialized one at a time"""
+        for start in range(0, self.row_count, self.chunk_rows):
+            yield self._frame(slice(start, start + self.chunk_rows))
+
+    def frame(self):
+        return self._frame(slice(None))
+
+    def memory_usage(self):
+        """Bytes held in memory by the offset index (column data stays on disk)"""
+        return int(self.index.ids.nbytes + self.index.starts.nbytes + self.index.counts.nbytes)
+
+    def disk_usage(self):
+        return int(sum(array.nbytes for array in self._arrays))
+
+
+def open_mmap_store(file_path, on_progress=None, cancel_event=None):
+    """Open the memory-mapped store for file_path, building it first if the CSV changed.
+
+    Returns a (MmapPatientStore, MmapIndex) pair, like load_patient_file().
+    """
+    directory = mmap_dir(file_path)
+    if not os.path.exists(os.path.join(directory, META_FILE)):
+        # Column files built from older versions of this CSV
+        for stale in stale_versions(file_path, "mmap"):
+            shutil.rmtree(stale, ignore_errors=True)
+        build_mmap_store(file_path, on_progress=on_progress, cancel_event=cancel_event)
+    store = MmapPatientStore(directory)
+    if on_progress:
+        on_progress(1, 1)
+    return store, store.index
@@ -0,0 +1,213 @@
+import csv
+import time
+from datetime import datetime
+
+# Timestamp format used by the dataset CSV (day first)
+CSV_TIMESTAMP_FORMAT = "%d-%m-%Y %H:%M"
+
+# CSV column -> vitals column
+CSV_COLUMNS = {
+    "Patient_ID": "patient_id",
+    "Timestamp": "ts",
+    "Temperature (°C)": "temperature",
+    "Systolic_BP (mmHg)": "systolic_bp",
+    "Diastolic_BP (mmHg)": "diastolic_bp",
+    "Heart_Rate (bpm)": "heart_rate",
+    "Target_Blood_Pressure": "target_bp",
+    "Target_Heart_Rate": "target_hr",
+}
+
+VITALS_FIELDS = tuple(CSV_COLUMNS.values())
+
+# Rows handed to executemany() at a time
+BATCH_ROWS = 10_000
+
+
+def ensure_vitals_table(conn):
+    """Create the vitals time-series table.
+
+    The (patient_id, ts) primary key on a WITHOUT ROWID table is the composite
+    index itself, so a patient's readings are stored contiguously in time order.
+    The caller commits.
+    """
+    conn.execute('''CREATE TABLE IF NOT EXISTS vitals (
+                        patient_id INTEGER NOT NULL,
+                        ts TEXT NOT NULL,
+                        temperature REAL,
+                        systolic_bp INTEGER,
+                        diastolic_bp INTEGER,
+                        heart_rate INTEGER,
+                        target_bp INTEGER,
+                        target_hr INTEGER,
+                        PRIMARY KEY (patient_id, ts)) WITHOUT ROWID''')
+
+
+def parse_timestamp(value):
+    """Parse a datetime, CSV timestamp or ISO string; raises ValueError if it isn't one.
+
+    Times with a UTC offset are converted to naive local time, like the CSV's.
+    """
+    if not isinstance(value, datetime):
+        value = value.strip()
+        try:
+            value = datetime.strptime(value, CSV_TIMESTAMP_FORMAT)
+        except ValueError:
+            value = datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def format_ts(moment):
+    """The text stored in ts: "YYYY-MM-DD HH:MM", extended with seconds only when present.
+
+    Whole minutes match CSV rows exactly, so one reading from either source
+    has one key, and the longer forms still sort chronologically as text.
+    """
+    if moment.microsecond:
+        return moment.isoformat(sep=" ", timespec="microseconds")
+    if moment.second:
+        return moment.isoformat(sep=" ", timespec="seconds")
+    return moment.isoformat(sep=" ", timespec="minutes")
+
+
+def to_iso(value):
+    """Normalize a datetime, CSV timestamp or ISO string to the text stored in ts"""
+    try:
+        return format_ts(parse_timestamp(value))
+    except ValueError:
+        # Not a timestamp; compared as text as given
+        return value.strip()
+
+
+def _number(value, cast):
+    value = value.strip() if value else ""
+    if not value:
+        return None
+    return cast(float(value))
+
+
+def parse_csv_row(row):
+    """Convert one csv.DictReader row to a vitals tuple, or None if it has no id/timestamp"""
+    patient_id = row.get("Patient_ID")
+    timestamp = row.get("Timestamp")
+    if not patient_id or not timestamp:
+        return None
+    return (
+        _number(patient_id, int),
+        to_iso(timestamp),
+        _number(row.get("Temperature (°C)"), float),
+        _number(row.get("Systolic_BP (mmHg)"), int),
+        _number(row.get("Diastolic_BP (mmHg)"), int),
+        _number(row.get("Heart_Rate (bpm)"), int),
+        _number(row.get("Target_Blood_Pressure"), int),
+        _number(row.get("Target_Heart_Rate"), int),
+    )
+
+
+def iter_csv_vitals(file_path):
+    """Stream vitals tuples out of a dataset CSV"""
+    with open(file_path, newline="", encoding="utf-8-sig") as handle:
+        for row in csv.DictReader(handle):
+            vitals = parse_csv_row(row)
+            if vitals is not None:
+                yield vitals
+
+
+def insert_vitals(conn, rows):
+    """Insert (or overwrite) readings; rows are tuples in VITALS_FIELDS order"""
+    placeholders = ", ".join("?" * len(VITALS_FIELDS))
+    conn.executemany(f"INSERT OR REPLACE INTO vitals ({', '.join(VITALS_FIELDS)}) VALUES ({placeholders})", rows)
+
+
+def load_vitals_csv(conn, file_path, batch_rows=BATCH_ROWS):
+    """Bulk-load a dataset CSV into vitals in one transaction; returns rows loaded"""
+    count = 0
+    batch = []
+    with conn:
+        for vitals in iter_csv_vitals(file_path):
+            batch.append(vitals)
+            if len(batch) >= batch_rows:
+                insert_vitals(conn, batch)
+                count += len(batch)
+                batch = []
+        if batch:
+            insert_vitals(conn, batch)
+            count += len(batch)
+    return count
+
+
+def query_range(conn, patient_id, start=None, end=None):
+    """A patient's readings with start <= ts < end (either bound optional), oldest first"""
+    sql = f"SELECT {', '.join(VITALS_FIELDS)} FROM vitals WHERE patient_id = ?"
+    params = [patient_id]
+    if start is not None:
+        sql += " AND ts >= ?"
+        params.append(to_iso(start))
+    if end is not None:
+        sql += " AND ts < ?"
+        params.append(to_iso(end))
+    return conn.execute(sql + " ORDER BY ts", params).fetchall()
+
+
+def latest_vitals(conn, patient_id):
+    """Most recent reading for a patient, or None"""
+    return conn.execute(f"SELECT {', '.join(VITALS_FIELDS)} FROM vitals WHERE patient_id = ? "
+                        "ORDER BY ts DESC LIMIT 1", (patient_id,)).fetchone()
+
+
+def bulk_load_vitals(conn, file_path, batch_rows=BATCH_ROWS, on_progress=None):
+    """Fast path for large CSVs; returns (rows_loaded, seconds).
+
+    Rows are appended to an unindexed temp staging table in large
+    executemany() batches, then moved into vitals in one sorted
+    INSERT ... SELECT, so the (patient_id, ts) B-tree is built in key order
+    instead of by random inserts. Secondary indexes on vitals are dropped
+    for the load and rebuilt afterwards. on_progress(rows, seconds) is
+    called after every batch.
+    """
+    started = time.perf_counter()
+    fields = ", ".join(VITALS_FIELDS)
+    placeholders = ", ".join("?" * len(VITALS_FIELDS))
+    indexes = conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' "
+                           "AND tbl_name = 'vitals' AND sql IS NOT NULL").fetchall()
+    synchronous = conn.execute("PRAGMA synchronous").fetchone()[0]
+    cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA cache_size = -200000")
+    try:
+        conn.execute("DROP TABLE IF EXISTS temp.vitals_staging")
+        conn.execute(f"CREATE TEMP TABLE vitals_staging ({fields})")
+
+        count = 0
+        with conn:
+            batch = []
+            for vitals in iter_csv_vitals(file_path):
+                batch.append(vitals)
+                if len(batch) >= batch_rows:
+                    conn.executemany(f"INSERT INTO vitals_staging VALUES ({placeholders})", batch)
+                    count += len(batch)
+                    batch = []
+                    if on_progress:
+                        on_progress(count, time.perf_counter() - started)
+            if batch:
+                conn.executemany(f"INSERT INTO vitals_staging VALUES ({placeholders})", batch)
+                count += len(batch)
+
+        with conn:
+            for name, _ in indexes:
+                conn.execute(f'DROP INDEX "{name}"')
+            conn.execute(f"INSERT OR REPLACE INTO vitals ({fields}) "
+                         f"SELECT {fields} FROM vitals_staging ORDER BY patient_id, ts")
+            for _, sql in indexes:
+                conn.execute(sql)
+        conn.execute("DROP TABLE vitals_staging")
+    finally:
+        conn.execute(f"PRAGMA synchronous = {synchronous}")
+        conn.execute(f"PRAGMA cache_size = {cache_size}")
+
+    elapsed = time.perf_counter() - started
+    if on_progress:
+        on_progress(count, elapsed)
+    return count, elapsed
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import queue
+import sqlite3
+import threading
+
+from vitals_store import VITALS_FIELDS, format_ts, insert_vitals, parse_timestamp
+
+# Local TCP endpoint bedside feeds connect to (portable where named pipes aren't)
+STREAM_HOST = "127.0.0.1"
+STREAM_PORT = 8765
+
+# A micro-batch is written when it reaches BATCH_MAX events or BATCH_WINDOW seconds
+BATCH_MAX = 500
+BATCH_WINDOW = 0.25
+
+
+# Plausible range for each reading; events outside it are rejected
+FIELD_RANGES = {
+    "temperature": (25.0, 45.0),
+    "systolic_bp": (40, 300),
+    "diastolic_bp": (20, 200),
+    "heart_rate": (20, 300),
+    "target_bp": (40, 300),
+    "target_hr": (20, 300),
+}
+
+# Readings stored as REAL; the rest are whole numbers
+FLOAT_FIELDS = ("temperature",)
+
+
+def _reading(field, value):
+    """Coerce one reading to a number within FIELD_RANGES, or raise ValueError"""
+    if value is None:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(f"{field} must be a number")
+    number = float(value)
+    low, high = FIELD_RANGES[field]
+    if not low <= number <= high:
+        raise ValueError(f"{field} {number:g} is outside {low}-{high}")
+    return number if field in FLOAT_FIELDS else int(round(number))
+
+
+def parse_event(line):
+    """Decode one newline-delimited JSON vitals event into a vitals tuple.
+
+    Expected keys: patient_id, ts and any of temperature, systolic_bp,
+    diastolic_bp, heart_rate, target_bp, target_hr. Readings are coerced to
+    numbers and range-checked. Raises ValueError on bad input.
+    """
+    event = json.loads(line)
+    if not isinstance(event, dict) or "patient_id" not in event or "ts" not in event:
+        raise ValueError("event needs patient_id and ts")
+    patient_id = event["patient_id"]
+    if isinstance(patient_id, bool) or not isinstance(patient_id, (int, str)):
+        raise ValueError("patient_id must be an integer")
+    patient_id = int(patient_id)
+    if not 0 < patient_id < 2 ** 63:
+        raise ValueError(f"patient_id {patient_id} is out of range")
+    if not isinstance(event["ts"], str):
+        raise ValueError("ts must be a timestamp string")
+    # Stored in the canonical ts form, so "2024-01-01T00:00:00" and the CSV's
+    # "01-01-2024 00:00" are one key and compare correctly as text
+    ts = format_ts(parse_timestamp(event["ts"]))
+    return (patient_id, ts) + tuple(_reading(field, event.get(field)) for field in VITALS_FIELDS[2:])
+
+
+def write_batch(conn, batch):
+    """Store a micro-batch and refresh patients' current readings; returns changed patient ids"""
+    latest = {}
+    for vitals in batch:
+        current = latest.get(vitals[0])
+        if current is None or vitals[1] >= current[1]:
+            latest[vitals[0]] = vitals
+
+    changed = set()
+    with conn:
+        insert_vitals(conn, batch)
+        for patient_id, vitals in latest.items():
+            temperature, heart_rate = vitals[2], vitals[5]
+            cursor = conn.execute("UPDATE patients SET heart_rate = COALESCE(?, heart_rate), "
+                                  "temperature = COALESCE(?, temperature) WHERE id = ?",
+                                  (heart_rate, temperature, patient_id))
+            if cursor.rowcount:
+                changed.add(patient_id)
+    return changed
+
+
+class VitalsStreamServer:
+    """Asyncio server that ingests live vitals events on its own thread.
+
+    Clients send newline-delimited JSON events (see parse_event). Events are
+    written to the database in micro-batches, and the ids of patients whose
+    current readings changed are queued for the GUI to pick up with
+    drain_changes(), so only those rows need redrawing.
+    """
+
+    def __init__(self, connect, host=STREAM_HOST, port=STREAM_PORT):
+        self.connect = connect
+        self.host = host
+        self.port = port
+        self.changes = queue.Queue()
+        self.rejected = 0
+        self.error = None
+        self._loop = None
+        self._stopping = None
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="vitals-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._loop is not None and self._stopping is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def take_error(self):
+        """Return and clear the last error (safe to call from the Tk thread)"""
+        error, self.error = self.error, None
+        return error
+
+    def drain_changes(self):
+        """Patient ids changed since the last call (safe to call from the Tk thread)"""
+        changed = set()
+        while True:
+            try:
+                changed |= self.changes.get_nowait()
+            except queue.Empty:
+                return changed
+
+    def _run(self):
+        try:
+            asyncio.run(self._serve())
+        except Exception as e:
+            self.error = e
+
+    async def _serve(self):
+        self._loop = asyncio.get_running_loop()
+        self._stopping = asyncio.Event()
+        events = asyncio.Queue()
+        # connect() is called on the stream thread, e.g. ConnectionPool.connection
+        conn = self.connect()
+
+        server = await asyncio.start_server(lambda reader, writer: self._read_client(reader, writer, events),
+                                            self.host, self.port)
+        writer_task = asyncio.create_task(self._write_batches(conn, events))
+        try:
+            async with server:
+                await self._stopping.wait()
+        finally:
+            writer_task.cancel()
+
+    async def _read_client(self, reader, writer, events):
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                try:
+                    events.put_nowait(parse_event(line))
+                except (ValueError, TypeError):
+                    self.rejected += 1
+        finally:
+            writer.close()
+
+    async def _write_batches(self, conn, events):
+        while True:
+            batch = [await events.get()]
+            deadline = self._loop.time() + BATCH_WINDOW
+            while len(batch) < BATCH_MAX:
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(events.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            changed = self._write(conn, batch)
+            if changed:
+                self.changes.put(changed)
+
+    def _write(self, conn, batch):
+        try:
+            return write_batch(conn, batch)
+        except sqlite3.Error as e:
+            if len(batch) == 1:
+                # Drop the event rather than stall the feed; surface the last error
+                self.rejected += 1
+                self.error = e
+                return set()
+        # Retry one event at a time so a single bad row doesn't cost the rest of the batch
+        changed = set()
+        for vitals in batch:
+            changed |= self._write(conn, [vitals])
+        return changed